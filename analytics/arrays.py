@@ -0,0 +1,113 @@
+# analytics/arrays.py
+
+import numpy as np
+import pandas as pd
+
+# Rows per restart of the running sums behind the rolling statistics
+_BLOCK = 1 << 14
+
+def as_array(values, dtype=float):
+    """
+    NumPy array from a pandas Series, NumPy (or masked) array, list, or
+    pyarrow Array / ChunkedArray, without copying where the source allows.
+    With a float dtype, NULLs become NaN. dtype=None keeps the source type
+    (e.g. ts columns).
+    """
+    if isinstance(values, pd.Series):
+        values = values.to_numpy()
+    elif not isinstance(values, np.ndarray) and hasattr(values, "to_numpy"):
+        # pyarrow arrays; NULLs in float columns come out as NaN
+        values = values.to_numpy(zero_copy_only=False)
+
+    if np.ma.isMaskedArray(values):
+        if dtype is None:
+            return values.data
+        return values.astype(dtype).filled(np.nan)
+    return np.asarray(values, dtype=dtype)
+
+def column(data, name, dtype=float):
+    """
+    One column of a DataFrame, a {name: array} mapping (as returned by
+    MarketDataStore.fetch_numpy) or a pyarrow Table / RecordBatch.
+    """
+    return as_array(data[name], dtype)
+
+def columns(data):
+    """
+    {name: NumPy array} for every column of the same kinds of input.
+    """
+    names = getattr(data, "column_names", None) or list(data.keys())
+    return {name: column(data, name, dtype=None) for name in names}
+
+def _moving_sum(values, window):
+    c = np.concatenate(([0], np.cumsum(values)))
+    return c[window:] - c[:-window]
+
+def _window_blocks(x, window):
+    """
+    Yields (out, segment) per block: `out` is the slice of the result filled
+    by the windows ending in this block, `segment` the input rows they cover.
+    Restarting the running sums each block bounds their rounding drift.
+    """
+    n_windows = len(x) - window + 1
+    for start in range(0, max(n_windows, 0), _BLOCK):
+        stop = min(start + _BLOCK, n_windows)
+        yield slice(start + window - 1, stop + window - 1), slice(start, stop + window - 1)
+
+def _centered(segment):
+    """
+    Segment shifted by its first finite value, NaN replaced by 0, plus the
+    NaN mask; the shift keeps the squared sums small.
+    """
+    bad = np.isnan(segment)
+    finite = segment[~bad]
+    ref = finite[0] if len(finite) else 0.0
+    return np.where(bad, 0.0, segment - ref), bad, ref
+
+def rolling_mean_std(values, window):
+    """
+    Rolling mean and sample std over full windows, as NumPy arrays aligned
+    with the input; like pandas rolling(window), the first window - 1 rows
+    and any window holding a NaN are NaN.
+    """
+    x = as_array(values)
+    mean = np.full(len(x), np.nan)
+    std = np.full(len(x), np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for out, seg in _window_blocks(x, window):
+            d, bad, ref = _centered(x[seg])
+            s1 = _moving_sum(d, window)
+            s2 = _moving_sum(d * d, window)
+            missing = _moving_sum(bad, window) > 0
+
+            m = s1 / window
+            var = np.maximum(s2 - s1 * m, 0.0) / (window - 1) if window > 1 else np.nan
+            mean[out] = np.where(missing, np.nan, m + ref)
+            std[out] = np.where(missing, np.nan, np.sqrt(var))
+
+    return mean, std
+
+def rolling_corr(x, y, window):
+    """
+    Rolling Pearson correlation of two equal-length series over full windows,
+    NaN-aligned like rolling_mean_std.
+    """
+    x = as_array(x)
+    y = as_array(y)
+    corr = np.full(len(x), np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for out, seg in _window_blocks(x, window):
+            dx, bad_x, _ = _centered(x[seg])
+            dy, bad_y, _ = _centered(y[seg])
+            sx = _moving_sum(dx, window)
+            sy = _moving_sum(dy, window)
+            cov = _moving_sum(dx * dy, window) - sx * sy / window
+            vx = _moving_sum(dx * dx, window) - sx * sx / window
+            vy = _moving_sum(dy * dy, window) - sy * sy / window
+            missing = _moving_sum(bad_x | bad_y, window) > 0
+
+            corr[out] = np.where(missing, np.nan, cov / np.sqrt(vx * vy))
+
+    return corr
@@ -1,19 +1,29 @@
 import pandas as pd
 
+from analytics.arrays import column
+
 def mean_reversion_backtest(
     df,
     entry_z=2.0,
     exit_z=0.0
 ):
+    """
+    df needs ts, spread and zscore: a DataFrame, {name: array} or a pyarrow
+    table.
+    """
     trades = []
     position = 0
     entry_spread = None
     entry_time = None
 
-    for i in range(len(df)):
-        z = df["zscore"].iloc[i]
-        spread = df["spread"].iloc[i]
-        ts = df["ts"].iloc[i]
+    zscores = column(df, "zscore")
+    spreads = column(df, "spread")
+    times = column(df, "ts", dtype=None)
+
+    for i in range(len(zscores)):
+        z = zscores[i]
+        spread = spreads[i]
+        ts = times[i]
 
         if position == 0:
             if z > entry_z:
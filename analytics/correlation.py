@@ -1,4 +1,13 @@
 # analytics/correlation.py
 
+import pandas as pd
+
+from analytics.arrays import rolling_corr
+
 def rolling_correlation(series1, series2, window=30):
-    return series1.rolling(window).corr(series2)
+    """
+    Series in, Series out; NumPy or pyarrow input gives a NumPy array.
+    """
+    if isinstance(series1, pd.Series):
+        return series1.rolling(window).corr(series2)
+    return rolling_corr(series1, series2, window)
@@ -3,13 +3,17 @@
 import numpy as np
 import pandas as pd
 
+from analytics.arrays import as_array, rolling_mean_std
+
 def ols_hedge_ratio(y, x):
     """
     y = dependent (e.g. BTC)
     x = independent (e.g. ETH)
+
+    Series, NumPy or pyarrow columns.
     """
-    x = np.asarray(x)
-    y = np.asarray(y)
+    x = as_array(x)
+    y = as_array(y)
 
     x = np.column_stack([np.ones(len(x)), x])
     beta = np.linalg.lstsq(x, y, rcond=None)[0]
@@ -17,9 +21,20 @@ def ols_hedge_ratio(y, x):
     return beta[1]  # hedge ratio
 
 def compute_spread(y, x, hedge_ratio):
-    return y - hedge_ratio * x
+    if isinstance(y, pd.Series):
+        return y - hedge_ratio * x
+    return as_array(y) - hedge_ratio * as_array(x)
 
 def compute_zscore(series, window=30):
-    mean = series.rolling(window).mean()
-    std = series.rolling(window).std()
-    return (series - mean) / std
+    """
+    Rolling z-score; a Series in gives a Series out, NumPy or pyarrow input
+    a NumPy array.
+    """
+    if isinstance(series, pd.Series):
+        mean = series.rolling(window).mean()
+        std = series.rolling(window).std()
+        return (series - mean) / std
+
+    values = as_array(series)
+    mean, std = rolling_mean_std(values, window)
+    return (values - mean) / std
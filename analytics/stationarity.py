@@ -1,9 +1,13 @@
 # analytics/stationarity.py
 
+import numpy as np
 from statsmodels.tsa.stattools import adfuller
 
+from analytics.arrays import as_array
+
 def adf_test(series):
-    result = adfuller(series.dropna())
+    values = as_array(series)
+    result = adfuller(values[~np.isnan(values)])
     return {
         "adf_stat": result[0],
         "p_value": result[1],
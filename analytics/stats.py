@@ -3,12 +3,27 @@
 import pandas as pd
 import numpy as np
 
+from analytics.arrays import column, columns, rolling_mean_std
+
+# Both functions take a DataFrame and return a copy with the new column, or
+# take {name: array} / a pyarrow table and return {name: NumPy array}.
+
 def compute_returns(df, price_col="close"):
-    df = df.copy()
-    df["returns"] = np.log(df[price_col]).diff()
-    return df
+    if isinstance(df, pd.DataFrame):
+        df = df.copy()
+        df["returns"] = np.log(df[price_col]).diff()
+        return df
+
+    out = columns(df)
+    out["returns"] = np.concatenate(([np.nan], np.diff(np.log(column(df, price_col)))))
+    return out
 
 def rolling_volatility(df, window=30):
-    df = df.copy()
-    df["volatility"] = df["returns"].rolling(window).std()
-    return df
+    if isinstance(df, pd.DataFrame):
+        df = df.copy()
+        df["volatility"] = df["returns"].rolling(window).std()
+        return df
+
+    out = columns(df)
+    out["volatility"] = rolling_mean_std(column(df, "returns"), window)[1]
+    return out
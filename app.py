@@ -1,10 +1,14 @@
+from datetime import timedelta
+
 import streamlit as st
 import plotly.express as px
 
 from analytics.backtest import mean_reversion_backtest
 from storage.datastore import MarketDataStore
+from storage.maintenance import MaintenanceJob
 from ingestion.binance_ws import BinanceWebSocketIngestor
-from resampling.sampler import Resampler
+from resampling.service import ResamplingService
+from resampling.bar_builder import StreamingBarBuilder
 from alerts.rules import zscore_alert
 
 
@@ -16,9 +20,12 @@ from utils.config import (
     DEFAULT_SYMBOLS,
     DEFAULT_TIMEFRAME,
     DEFAULT_ROLLING_WINDOW,
+    DEFAULT_LOOKBACK,
+    ANALYTICS_LOOKBACK_HOURS,
     DEFAULT_Z_ALERT_THRESHOLD,
     DEFAULT_BACKTEST_ENTRY_Z,
-    SUPPORTED_TIMEFRAMES
+    SUPPORTED_TIMEFRAMES,
+    SUPPORTED_INFO_BARS
 )
 
 st.set_page_config(page_title="Stat Arb Analytical Dashboard", layout="wide")
@@ -50,34 +57,38 @@ with st.expander("How to use this dashboard"):
 @st.cache_resource
 def start_ingestion():
     datastore = MarketDataStore()
+    MaintenanceJob(datastore).start()
     ingestor = BinanceWebSocketIngestor(
         symbols=DEFAULT_SYMBOLS,
-        datastore=datastore
+        datastore=datastore,
+        bar_builder=StreamingBarBuilder()
     )
+    # 1s bars are built in the ingestion path by StreamingBarBuilder;
+    # coarser timeframes cascade from them in the background, so reruns
+    # of this script only ever read
+    resampling = ResamplingService(
+        datastore,
+        DEFAULT_SYMBOLS,
+        SUPPORTED_TIMEFRAMES + SUPPORTED_INFO_BARS
+    ).attach(ingestor)
+    resampling.start()
     ingestor.start()
-    return datastore
-
-
-datastore = start_ingestion()
-resampler = Resampler(datastore)
+    return datastore, resampling
 
 
-@st.cache_data(ttl=5)
-def run_resampling():
-    for sym in ["btcusdt", "ethusdt"]:
-        for tf in ["1s", "1m", "5m"]:
-            resampler.resample(sym, tf)
-    return True
-
-
-run_resampling()
+datastore, resampling = start_ingestion()
 
 
 st.sidebar.header("Analytics Controls")
-timeframes = SUPPORTED_TIMEFRAMES
+timeframes = SUPPORTED_TIMEFRAMES + SUPPORTED_INFO_BARS
 default_tf_index = timeframes.index(DEFAULT_TIMEFRAME)
 timeframe = st.sidebar.selectbox("Timeframe", timeframes, index=default_tf_index)
+
+bar_watermark = resampling.latest_watermark(DEFAULT_SYMBOLS[0], timeframe)
+st.sidebar.caption(f"Bars current through: {bar_watermark or 'pending'}")
 window = st.sidebar.slider("Rolling Window", 10, 100, DEFAULT_ROLLING_WINDOW)
+lookbacks = list(ANALYTICS_LOOKBACK_HOURS)
+lookback = st.sidebar.selectbox("Lookback", lookbacks, index=lookbacks.index(DEFAULT_LOOKBACK))
 
 refresh = st.sidebar.button("Refresh Analytics", use_container_width=True)
 
@@ -85,29 +96,17 @@ refresh = st.sidebar.button("Refresh Analytics", use_container_width=True)
 if refresh or "analytics_loaded" not in st.session_state:
     st.session_state["analytics_loaded"] = True
 
-    btc = datastore.con.execute(
-        """
-        SELECT ts, close
-        FROM ohlc
-        WHERE symbol='btcusdt' AND timeframe=?
-        ORDER BY ts
-        """,
-        [timeframe]
-    ).fetchdf()
-
-    eth = datastore.con.execute(
-        """
-        SELECT ts, close
-        FROM ohlc
-        WHERE symbol='ethusdt' AND timeframe=?
-        ORDER BY ts
-        """,
-        [timeframe]
-    ).fetchdf()
-
-    if not btc.empty and not eth.empty:
-        df = btc.merge(eth, on="ts", suffixes=("_btc", "_eth"))
-
+    # Time bars come on a dense bucket grid (a leg without trades keeps its
+    # last close, so rolling windows span the same stretch of time); info
+    # bars pair each bar with the other leg's latest one
+    hours = ANALYTICS_LOOKBACK_HOURS[lookback]
+    df = datastore.get_aligned_closes(
+        ["btcusdt", "ethusdt"],
+        timeframe,
+        lookback=timedelta(hours=hours) if hours else None
+    ).rename(columns={"close_btcusdt": "close_btc", "close_ethusdt": "close_eth"})
+
+    if not df.empty:
         hedge = ols_hedge_ratio(df["close_btc"], df["close_eth"])
         df["spread"] = compute_spread(df["close_btc"], df["close_eth"], hedge)
         df["zscore"] = compute_zscore(df["spread"], window)
@@ -244,7 +243,7 @@ with st.container():
         "corr"
     ]].copy()
 
-    export_ohlc = datastore.con.execute(
+    export_ohlc = datastore.cursor().execute(
         """
         SELECT *
         FROM ohlc
@@ -0,0 +1,69 @@
+# benchmarks/bench_batch_resample.py
+#
+# Resample cost per flush cycle for many symbols: one Resampler pass per
+# symbol (resample_cascade in a loop) versus resample_batch over all symbols.
+# Each cycle inserts one second of ticks for every symbol, then resamples all
+# supported timeframes.
+#
+#   python -m benchmarks.bench_batch_resample --symbols 200
+
+import argparse
+import time
+
+import numpy as np
+
+from resampling.sampler import Resampler
+from storage.datastore import MarketDataStore
+from utils.config import SUPPORTED_TIMEFRAMES
+
+
+def tick_batch(cycle, n_symbols, per_symbol, rng):
+    n = n_symbols * per_symbol
+    return {
+        "ts": 1_700_000_000_000 + cycle * 1000 + rng.integers(0, 1000, n).astype(np.int64),
+        "symbol_id": np.repeat(np.arange(n_symbols, dtype=np.int32), per_symbol),
+        "price": rng.uniform(100, 200, n),
+        "size": rng.uniform(0.001, 2, n),
+        "trade_id": np.arange(n, dtype=np.int64),
+        "is_buyer_maker": rng.random(n) < 0.5,
+    }
+
+
+def run(mode, n_symbols, per_symbol, cycles, warmup):
+    store = MarketDataStore(":memory:")
+    resampler = Resampler(store)
+    symbols = [f"sym{i}usdt" for i in range(n_symbols)]
+    rng = np.random.default_rng(0)
+
+    times = []
+    for cycle in range(warmup + cycles):
+        store.insert_tick_columns(tick_batch(cycle, n_symbols, per_symbol, rng), symbols)
+
+        t0 = time.perf_counter()
+        if mode == "per-symbol":
+            for sym in symbols:
+                resampler.resample_cascade(sym, SUPPORTED_TIMEFRAMES)
+        else:
+            resampler.resample_batch(symbols, SUPPORTED_TIMEFRAMES)
+        if cycle >= warmup:
+            times.append(time.perf_counter() - t0)
+
+    return np.median(times) * 1000, max(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--ticks-per-symbol", type=int, default=20, help="per cycle (1s of trading)")
+    parser.add_argument("--cycles", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"symbols={args.symbols} timeframes={len(SUPPORTED_TIMEFRAMES)}")
+    for mode in ("per-symbol", "batch"):
+        median, worst = run(mode, args.symbols, args.ticks_per_symbol, args.cycles, args.warmup)
+        print(f"{mode:>10}: median {median:8.1f} ms/cycle   max {worst:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_bulk_insert.py
+#
+# Cost of writing one drained tick batch to DuckDB through each insert path,
+# starting from the columnar buffer's NumPy arrays:
+#
+#   register  DataFrame + register + INSERT ... SELECT * (the original path)
+#   numpy     MarketDataStore.insert_tick_columns(method="numpy")
+#   arrow     MarketDataStore.insert_tick_columns(method="arrow")
+#   append    MarketDataStore.insert_tick_columns(method="append")
+#
+#   python -m benchmarks.bench_bulk_insert
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from storage.datastore import MarketDataStore
+
+METHODS = ("register", "numpy", "arrow", "append")
+
+
+def make_batch(n, n_symbols=20):
+    rng = np.random.default_rng(0)
+    columns = {
+        "ts": 1_700_000_000_000 + np.arange(n, dtype=np.int64),
+        "symbol_id": rng.integers(0, n_symbols, n).astype(np.int32),
+        "price": rng.uniform(10, 100, n),
+        "size": rng.uniform(0.001, 5, n),
+        "trade_id": np.arange(n, dtype=np.int64),
+        "is_buyer_maker": rng.random(n) < 0.5,
+    }
+    return columns, [f"sym{i}usdt" for i in range(n_symbols)]
+
+
+def insert(store, method, columns, symbols):
+    if method == "register":
+        df = pd.DataFrame({
+            "ts": pd.to_datetime(columns["ts"], unit="ms"),
+            "symbol": np.asarray(symbols, dtype=object)[columns["symbol_id"]],
+            "price": columns["price"],
+            "size": columns["size"]
+        })
+        store.insert_ticks(df)
+    else:
+        store.insert_tick_columns(columns, symbols, method=method)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'batch':>9} " + " ".join(f"{m + ' ms':>12}" for m in METHODS) + f" {'fastest':>9}")
+    for n in args.sizes:
+        columns, symbols = make_batch(n)
+        timings = {}
+        for method in METHODS:
+            store = MarketDataStore(":memory:")
+            insert(store, method, columns, symbols)  # warm up
+            t0 = time.perf_counter()
+            for _ in range(args.repeat):
+                insert(store, method, columns, symbols)
+            timings[method] = (time.perf_counter() - t0) / args.repeat * 1000
+
+        best = min(timings, key=timings.get)
+        print(f"{n:>9} " + " ".join(f"{timings[m]:>12.2f}" for m in METHODS) + f" {best:>9}")
+
+
+if __name__ == "__main__":
+    main()
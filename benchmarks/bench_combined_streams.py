@@ -0,0 +1,103 @@
+# benchmarks/bench_combined_streams.py
+#
+# Compares the one-socket-per-symbol ingestor against combined-stream mode
+# and the asyncio ingestor. The bundled local stand-in server runs in a
+# separate process, so the CPU figures only cover the ingestor side.
+#
+#   python -m benchmarks.bench_combined_streams --symbols 100 --rate 20
+
+import argparse
+import multiprocessing as mp
+import time
+
+from ingestion.binance_async import AsyncBinanceIngestor
+from ingestion.binance_ws import BinanceWebSocketIngestor
+from ingestion.local_server import LocalBinanceServer
+
+
+class CountingStore:
+    """Stands in for MarketDataStore and only counts flushed rows."""
+
+    def __init__(self):
+        self.rows = 0
+
+    def insert_tick_columns(self, columns, symbols):
+        self.rows += len(columns["ts"])
+
+
+def _serve(port, rate, ready):
+    server = LocalBinanceServer(port=port, rate=rate).start()
+    ready.set()
+    server._thread.join()
+
+
+MODES = {
+    "per-symbol": (BinanceWebSocketIngestor, False),
+    "combined": (BinanceWebSocketIngestor, True),
+    "async": (AsyncBinanceIngestor, True),
+}
+
+
+def run_mode(mode, symbols, port, per_conn, duration):
+    cls, combined = MODES[mode]
+    store = CountingStore()
+    ingestor = cls(
+        symbols, store,
+        combined=combined,
+        symbols_per_connection=per_conn,
+        base_url=f"ws://127.0.0.1:{port}"
+    )
+
+    ingestor.start()
+    time.sleep(1.0)  # connect + warm up
+    store.rows = 0
+    ingestor._flush_buffer()
+    store.rows = 0
+
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    time.sleep(duration)
+    ingestor._flush_buffer()
+    cpu = time.process_time() - cpu0
+    wall = time.perf_counter() - wall0
+    threads = len(ingestor._threads) + (1 if cls is AsyncBinanceIngestor else 0)
+    ingestor.stop()
+
+    return {
+        "mode": mode,
+        "threads": threads,
+        "msgs_per_s": store.rows / wall,
+        "cpu_ms_per_symbol_s": cpu / wall / len(symbols) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=20.0, help="trades/s per symbol")
+    parser.add_argument("--per-conn", type=int, default=25)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    symbols = [f"sym{i}usdt" for i in range(args.symbols)]
+
+    ready = mp.Event()
+    server = mp.Process(target=_serve, args=(args.port, args.rate, ready), daemon=True)
+    server.start()
+    ready.wait(10)
+
+    try:
+        for mode in MODES:
+            res = run_mode(mode, symbols, args.port, args.per_conn, args.duration)
+            print(
+                f"{res['mode']:>10}: threads={res['threads']:4d} "
+                f"msgs/s={res['msgs_per_s']:10.0f} "
+                f"cpu/symbol={res['cpu_ms_per_symbol_s']:.3f} ms/s"
+            )
+            time.sleep(0.5)
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# benchmarks/bench_compact_schema.py
+#
+# Standard vs compact ticks layout (see MarketDataStore): file size, insert
+# rate through insert_tick_columns in flush-sized batches, and the time of a
+# one-symbol, one-hour range scan through the `ticks` view. Each layout is
+# measured as ingested and again after storage.migrate_ticks has rewritten it
+# sorted by (symbol, ts) into a fresh file.
+#
+#   python -m benchmarks.bench_compact_schema --ticks 5000000
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from storage.datastore import MarketDataStore
+from storage.migrate_ticks import vacuum_copy
+
+START = datetime(2024, 1, 1)
+
+
+def make_batches(n, n_symbols, batch, days):
+    rng = np.random.default_rng(0)
+    ts = 1_704_067_200_000 + np.sort(rng.integers(0, days * 86_400_000, n)).astype(np.int64)
+    columns = {
+        "ts": ts,
+        "symbol_id": rng.integers(0, n_symbols, n).astype(np.int32),
+        "price": np.round(rng.uniform(10, 100, n), 2),
+        "size": np.round(rng.uniform(0.001, 5, n), 3),
+        "trade_id": np.arange(n, dtype=np.int64),
+        "is_buyer_maker": rng.random(n) < 0.5,
+    }
+    for start in range(0, n, batch):
+        yield {name: col[start:start + batch] for name, col in columns.items()}
+
+
+def range_scan(store, symbol, days, repeats):
+    con = store.cursor()
+    times = []
+    for i in range(repeats):
+        lower = START + timedelta(hours=(i * 7) % (days * 24 - 1))
+        t0 = time.perf_counter()
+        con.execute(
+            """
+            SELECT COUNT(*), SUM(price * size)
+            FROM ticks
+            WHERE symbol = ? AND ts >= ? AND ts < ?
+            """,
+            [symbol, lower, lower + timedelta(hours=1)]
+        ).fetchall()
+        times.append(time.perf_counter() - t0)
+    return np.median(times) * 1000
+
+
+def open_store(path, compact=None):
+    return MarketDataStore(path, cold_dir=os.path.join(os.path.dirname(path), "cold"), compact=compact)
+
+
+def close_store(store):
+    store.connections.close()
+    store.con.close()
+
+
+def run(layout, args, workdir):
+    path = os.path.join(workdir, f"{layout}.duckdb")
+    symbols = [f"sym{i}usdt" for i in range(args.symbols)]
+    store = open_store(path, compact=layout == "compact")
+
+    t0 = time.perf_counter()
+    for batch in make_batches(args.ticks, args.symbols, args.batch, args.days):
+        store.insert_tick_columns(batch, symbols)
+    rate = args.ticks / (time.perf_counter() - t0)
+    store.checkpoint()
+
+    scan = range_scan(store, symbols[1], args.days, args.repeats)
+    close_store(store)
+    size = os.path.getsize(path)
+
+    store = open_store(path)
+    store.rewrite_ticks()
+    close_store(store)
+    vacuum_copy(path)
+    sorted_size = os.path.getsize(path)
+
+    store = open_store(path)
+    sorted_scan = range_scan(store, symbols[1], args.days, args.repeats)
+    close_store(store)
+
+    return rate, size, scan, sorted_size, sorted_scan
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticks", type=int, default=5_000_000)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=50_000, help="rows per insert (one flush)")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"ticks={args.ticks} symbols={args.symbols} batch={args.batch} days={args.days}")
+    print(f"{'layout':>9} {'insert rows/s':>14} {'size MB':>8} {'scan ms':>8} {'sorted MB':>10} {'sorted scan ms':>15}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for layout in ("standard", "compact"):
+            rate, size, scan, sorted_size, sorted_scan = run(layout, args, workdir)
+            print(
+                f"{layout:>9} {rate:>14,.0f} {size / 1e6:>8.1f} {scan:>8.2f} "
+                f"{sorted_size / 1e6:>10.1f} {sorted_scan:>15.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_end_to_end.py
+#
+# End-to-end ingest throughput and tick-to-storage latency against the local
+# stand-in server (ingestion/local_server.py), writing to a real DuckDB file.
+# Latency is measured per flushed tick as insert-complete time minus trade time.
+#
+#   python -m benchmarks.bench_end_to_end --symbols 100 --rate 50 --profile burst
+
+import argparse
+import multiprocessing as mp
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ingestion.binance_async import AsyncBinanceIngestor
+from ingestion.binance_ws import BinanceWebSocketIngestor
+from ingestion.local_server import PROFILES, LocalBinanceServer
+from storage.datastore import MarketDataStore
+
+
+class LatencyRecordingStore(MarketDataStore):
+    def __init__(self, db_path):
+        super().__init__(db_path)
+        self.latencies = []
+
+    def insert_tick_columns(self, columns, symbols, **kwargs):
+        super().insert_tick_columns(columns, symbols, **kwargs)
+        now_ms = time.time() * 1000
+        self.latencies.append(now_ms - columns["ts"])
+
+
+def _serve(args, ready):
+    server = LocalBinanceServer(
+        port=args.port,
+        rate=args.rate,
+        profile=args.profile,
+        burst_factor=args.burst_factor,
+        burst_every=args.burst_every
+    ).start()
+    ready.set()
+    server._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=20.0, help="trades/s per symbol")
+    parser.add_argument("--profile", choices=PROFILES, default="burst")
+    parser.add_argument("--burst-factor", type=float, default=10.0)
+    parser.add_argument("--burst-every", type=float, default=4.0)
+    parser.add_argument("--duration", type=float, default=8.0)
+    parser.add_argument("--engine", choices=("threads", "async"), default="async")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    ready = mp.Event()
+    server = mp.Process(target=_serve, args=(args, ready), daemon=True)
+    server.start()
+    ready.wait(10)
+
+    store = LatencyRecordingStore(str(Path(tempfile.mkdtemp()) / "bench.duckdb"))
+    cls = AsyncBinanceIngestor if args.engine == "async" else BinanceWebSocketIngestor
+    ingestor = cls(
+        [f"sym{i}usdt" for i in range(args.symbols)],
+        store,
+        combined=True,
+        base_url=f"ws://127.0.0.1:{args.port}"
+    )
+
+    try:
+        ingestor.start()
+        t0 = time.perf_counter()
+        time.sleep(args.duration)
+        ingestor.stop()
+        ingestor._flush_buffer()
+        wall = time.perf_counter() - t0
+    finally:
+        server.terminate()
+
+    rows = store.cursor().execute("SELECT COUNT(*) FROM ticks").fetchone()[0]
+    lat = np.concatenate(store.latencies) if store.latencies else np.array([np.nan])
+    metrics = ingestor.get_metrics()
+
+    print(f"engine={args.engine} profile={args.profile} symbols={args.symbols}")
+    print(f"ticks stored: {rows}  ({rows / wall:.0f}/s)  flushes: {metrics['flushes']}")
+    print(
+        "tick->storage latency ms: "
+        f"p50={np.percentile(lat, 50):.1f} p99={np.percentile(lat, 99):.1f} max={lat.max():.1f}"
+    )
+    print(f"max flush: {metrics['max_flush_seconds'] * 1000:.1f} ms  parse errors: {metrics['parse_errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/bench_incremental_resample.py
+#
+# Feeds ticks in flush-sized batches, runs an incremental Resampler pass after
+# each batch, then reports the cost of one incremental pass versus a full
+# recompute on the same history, and the per-timeframe share of a full
+# cascade. tests/test_resampler.py checks that both produce the same bars.
+#
+#   python -m benchmarks.bench_incremental_resample --ticks 2000000
+
+import argparse
+import time
+
+import numpy as np
+
+from resampling.sampler import TIMEFRAME_MAP, Resampler
+from storage.datastore import MarketDataStore
+
+SYMBOLS = ["btcusdt", "ethusdt"]
+
+
+def make_batches(n, batches, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = 1_700_000_000_000 + np.sort(rng.integers(0, n * 20, n)).astype(np.int64)
+    columns = {
+        "ts": ts,
+        "symbol_id": rng.integers(0, len(SYMBOLS), n).astype(np.int32),
+        "price": rng.uniform(100, 200, n),
+        "size": rng.uniform(0.001, 2, n),
+        "trade_id": np.arange(n, dtype=np.int64),
+        "is_buyer_maker": rng.random(n) < 0.5,
+    }
+    for idx in np.array_split(np.arange(n), batches):
+        yield {name: col[idx] for name, col in columns.items()}
+
+
+def resample_all(resampler, level_times=None):
+    for tf in TIMEFRAME_MAP:
+        t0 = time.perf_counter()
+        resampler._resample_level(SYMBOLS, tf)
+        if level_times is not None:
+            level_times[tf] = time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticks", type=int, default=200_000)
+    parser.add_argument("--batches", type=int, default=100)
+    args = parser.parse_args()
+
+    store = MarketDataStore(":memory:")
+    resampler = Resampler(store)
+    con = store.cursor()
+
+    passes = []
+    for batch in make_batches(args.ticks, args.batches):
+        store.insert_tick_columns(batch, SYMBOLS)
+        t0 = time.perf_counter()
+        resample_all(resampler)
+        passes.append(time.perf_counter() - t0)
+
+    con.execute("DELETE FROM ohlc")
+    con.execute("DELETE FROM resample_state")
+
+    levels = {}
+    t0 = time.perf_counter()
+    resample_all(resampler, levels)
+    full = time.perf_counter() - t0
+
+    bars = con.execute("SELECT COUNT(*) FROM ohlc").fetchone()[0]
+
+    print(f"ticks={args.ticks} batches={args.batches} bars={bars}")
+    print(f"incremental pass: median {np.median(passes) * 1000:.1f} ms, last {passes[-1] * 1000:.1f} ms")
+    print(f"full recompute:   {full * 1000:.1f} ms")
+    print("  " + "  ".join(f"{tf}={ms * 1000:.1f}ms" for tf, ms in levels.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/bench_ingest_contention.py
+#
+# Enqueue latency under contention: many producer threads (one per
+# connection) appending ticks while a flusher drains into DuckDB.
+#
+#   single-lock  one shared lock + TickBuffer, drained under that lock
+#   sharded      per-symbol ShardedTickBuffer with swap-on-flush
+#
+#   python -m benchmarks.bench_ingest_contention --symbols 200 --threads 8
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from ingestion.tick_buffer import ShardedTickBuffer, TickBuffer
+from storage.datastore import MarketDataStore
+
+
+class SingleLockBuffer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buffer = TickBuffer()
+
+    def append(self, ts, sym, price, size):
+        with self.lock:
+            self.buffer.append(ts, sym, price, size)
+
+    def drain(self):
+        with self.lock:
+            if not len(self.buffer):
+                return None, []
+            return self.buffer.drain(), list(self.buffer.symbols)
+
+
+class ShardedBuffer:
+    def __init__(self):
+        self.buffer = ShardedTickBuffer()
+
+    def append(self, ts, sym, price, size):
+        self.buffer.append(ts, sym, price, size)
+
+    def drain(self):
+        return self.buffer.drain(), list(self.buffer.symbols)
+
+
+def producer(buf, symbols, stop, samples):
+    lat = []
+    ts = 1_700_000_000_000
+    i = 0
+    while not stop.is_set():
+        sym = symbols[i % len(symbols)]
+        t0 = time.perf_counter_ns()
+        buf.append(ts + i, sym, 100.0, 0.01)
+        lat.append(time.perf_counter_ns() - t0)
+        i += 1
+        if i % 64 == 0:
+            time.sleep(0)  # yield, as a socket read would
+    samples.append(lat)
+
+
+def flusher(buf, store, stop, interval):
+    while not stop.is_set():
+        time.sleep(interval)
+        columns, symbols = buf.drain()
+        if columns is not None:
+            store.insert_tick_columns(columns, symbols)
+
+
+def run(kind, n_symbols, n_threads, duration, interval):
+    buf = SingleLockBuffer() if kind == "single-lock" else ShardedBuffer()
+    store = MarketDataStore(":memory:")
+    symbols = [f"SYM{i}USDT" for i in range(n_symbols)]
+    groups = [symbols[i::n_threads] for i in range(n_threads)]
+
+    stop = threading.Event()
+    samples = []
+    threads = [threading.Thread(target=producer, args=(buf, g, stop, samples)) for g in groups]
+    threads.append(threading.Thread(target=flusher, args=(buf, store, stop, interval)))
+
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    lat = np.concatenate([np.asarray(s) for s in samples]) / 1000.0
+    return len(lat) / duration, np.percentile(lat, 50), np.percentile(lat, 99), lat.max()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--flush-interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(f"{'buffer':>12} {'appends/s':>11} {'p50 us':>8} {'p99 us':>8} {'max us':>10}")
+    for kind in ("single-lock", "sharded"):
+        rate, p50, p99, worst = run(kind, args.symbols, args.threads, args.duration, args.flush_interval)
+        print(f"{kind:>12} {rate:>11.0f} {p50:>8.2f} {p99:>8.2f} {worst:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
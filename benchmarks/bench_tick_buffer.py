@@ -0,0 +1,78 @@
+# benchmarks/bench_tick_buffer.py
+#
+# Ingest-side cost of one second of trades at 10k / 100k / 1M ticks/s:
+# the old list-of-dicts + DataFrame path versus the columnar TickBuffer.
+# Both paths end with the rows inserted into an in-memory DuckDB store.
+#
+#   python -m benchmarks.bench_tick_buffer
+
+import argparse
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from ingestion.tick_buffer import TickBuffer
+from storage.datastore import MarketDataStore
+
+
+def make_trades(n, n_symbols=20):
+    rng = np.random.default_rng(0)
+    ts = (1_700_000_000_000 + np.arange(n) // max(1, n // 1000)).tolist()
+    syms = [f"SYM{i}USDT" for i in rng.integers(0, n_symbols, n)]
+    prices = rng.uniform(10, 100, n).round(2).tolist()
+    sizes = rng.uniform(0.001, 5, n).round(3).tolist()
+    return list(zip(ts, syms, prices, sizes))
+
+
+def dict_path(trades, store):
+    lock = threading.Lock()
+    buffer = []
+    for ts, sym, price, size in trades:
+        tick = {
+            "ts": datetime.fromtimestamp(ts / 1000, tz=timezone.utc),
+            "symbol": sym.lower(),
+            "price": price,
+            "size": size
+        }
+        with lock:
+            buffer.append(tick)
+
+    with lock:
+        df = pd.DataFrame(buffer)
+    store.insert_ticks(df)
+
+
+def columnar_path(trades, store):
+    lock = threading.Lock()
+    buffer = TickBuffer()
+    for ts, sym, price, size in trades:
+        with lock:
+            buffer.append(ts, sym, price, size)
+
+    with lock:
+        columns = buffer.drain()
+    store.insert_tick_columns(columns, buffer.symbols)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rates", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'ticks/s':>10} {'path':>9} {'seconds':>9} {'load':>7} {'max ticks/s':>12}")
+    for rate in args.rates:
+        trades = make_trades(rate)
+        for name, fn in (("dict", dict_path), ("columnar", columnar_path)):
+            store = MarketDataStore(":memory:")
+            t0 = time.perf_counter()
+            fn(trades, store)
+            elapsed = time.perf_counter() - t0
+            assert store.con.execute("SELECT COUNT(*) FROM ticks").fetchone()[0] == rate
+            print(f"{rate:>10} {name:>9} {elapsed:>9.3f} {elapsed * 100:>6.1f}% {rate / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
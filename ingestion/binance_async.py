@@ -0,0 +1,173 @@
+# ingestion/binance_async.py
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import websockets
+
+from ingestion.binance_ws import BinanceWebSocketIngestor
+from utils.config import BINANCE_WS_BASE_URL, DEFAULT_SYMBOLS_PER_CONNECTION
+
+class AsyncBinanceIngestor(BinanceWebSocketIngestor):
+    """
+    Same start()/stop() contract as BinanceWebSocketIngestor, but every socket,
+    the parse path and the flush schedule run on one asyncio event loop in a
+    single background thread. DuckDB writes are handed to an executor so a slow
+    insert never stalls message reads.
+    """
+
+    def __init__(
+        self,
+        symbols,
+        datastore,
+        flush_interval=1.0,
+        combined=True,
+        symbols_per_connection=DEFAULT_SYMBOLS_PER_CONNECTION,
+        base_url=BINANCE_WS_BASE_URL,
+        flush_policy=None,
+        recorder=None,
+        bar_builder=None,
+        reconnect_delay=1.0
+    ):
+        """
+        reconnect_delay: seconds to wait before reopening a dropped socket
+        """
+        super().__init__(
+            symbols,
+            datastore,
+            flush_interval=flush_interval,
+            combined=combined,
+            symbols_per_connection=symbols_per_connection,
+            base_url=base_url,
+            flush_policy=flush_policy,
+            recorder=recorder,
+            bar_builder=bar_builder
+        )
+        self.reconnect_delay = reconnect_delay
+
+        self._loop = None
+        self._tasks = []
+        self._executor = None
+        self._flush_event = None
+
+    # ---------- Flushing ----------
+
+    def _request_flush(self):
+        # Producers run on the event loop thread, so the Event can be set directly
+        if self._flush_event is not None:
+            self._flush_event.set()
+
+    def _make_room(self, symbol):
+        # Blocking would stall the whole loop; with "block" the consumers await
+        # a flush instead (see _consume), which stops reads on that socket.
+        if self.flush_policy.overflow != "block":
+            super()._make_room(symbol)
+
+    async def _flush_async(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._flush_buffer)
+
+    # ---------- Coroutines ----------
+
+    async def _consume(self, symbols):
+        url = self._stream_url(symbols)
+
+        while self._running:
+            try:
+                async with websockets.connect(url, max_queue=None) as ws:
+                    self._on_open(ws)
+                    async for message in ws:
+                        self._on_message(ws, message)
+                        if self.flush_policy.is_full(self._buffer.rows):
+                            await self._flush_async()
+                    self._on_close(ws, ws.close_code, ws.close_reason)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._on_error(None, e)
+
+            if self._running:
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def _flush_schedule(self):
+        policy = self.flush_policy
+
+        while self._running:
+            self._flush_event.clear()
+
+            with self._lock:
+                due = self._flush_due()
+                wait = policy.wait_time(self._buffer.rows, self._buffer.age())
+                self._flush_requested = False
+
+            if due:
+                await self._flush_async()
+                continue
+
+            try:
+                await asyncio.wait_for(
+                    self._flush_event.wait(),
+                    policy.max_age if wait is None else wait
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def _main(self):
+        self._flush_event = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._consume(group))
+            for group in self._connection_groups()
+        ]
+        self._tasks.append(asyncio.create_task(self._flush_schedule()))
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        try:
+            self._loop.run_until_complete(self._main())
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    def _cancel_tasks(self):
+        for task in self._tasks:
+            task.cancel()
+
+    # ---------- Public API ----------
+
+    def start(self):
+        if self._running:
+            return
+
+        self._running = True
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="flush")
+
+        t = threading.Thread(target=self._run_loop, daemon=True)
+        t.start()
+        self._threads.append(t)
+
+        print("Binance async ingestion started.")
+
+    def stop(self):
+        self._running = False
+
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._cancel_tasks)
+        for t in self._threads:
+            t.join(timeout=30)
+        self._threads = []
+
+        # Lets a flush already handed to the executor finish first
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._flush_final()
+
+        if self.recorder is not None:
+            self.recorder.close()
+
+        print("Binance async ingestion stopped.")
@@ -1,48 +1,111 @@
 # ingestion/binance_ws.py
 
-import json
 import threading
 import time
 import websocket
-import pandas as pd
-from datetime import datetime, timezone
+
+from ingestion.decoder import TradeDecoder, TradeDecodeError
+from ingestion.flush_policy import FlushPolicy
+from ingestion.spill import TickSpill
+from ingestion.tick_buffer import ROW_BYTES, ShardedTickBuffer
+from utils.config import BINANCE_WS_BASE_URL, DEFAULT_SYMBOLS_PER_CONNECTION
 
 class BinanceWebSocketIngestor:
-    def __init__(self, symbols, datastore, flush_interval=1.0):
+    def __init__(
+        self,
+        symbols,
+        datastore,
+        flush_interval=1.0,
+        combined=False,
+        symbols_per_connection=DEFAULT_SYMBOLS_PER_CONNECTION,
+        base_url=BINANCE_WS_BASE_URL,
+        flush_policy=None,
+        recorder=None,
+        bar_builder=None
+    ):
         """
         symbols: list of strings, e.g. ['btcusdt', 'ethusdt']
         datastore: MarketDataStore instance
-        flush_interval: seconds
+        flush_interval: seconds; max buffer age when no flush_policy is given
+        combined: multiplex symbols over /stream?streams=... connections
+        symbols_per_connection: streams per connection in combined mode
+        base_url: WebSocket endpoint, e.g. wss://fstream.binance.com
+        flush_policy: FlushPolicy (size/age triggers, buffer bound, overflow)
+        recorder: optional FrameRecorder that captures every raw frame
+        bar_builder: optional StreamingBarBuilder fed from every flush
         """
         self.symbols = symbols
         self.datastore = datastore
         self.flush_interval = flush_interval
+        self.combined = combined
+        self.symbols_per_connection = max(1, int(symbols_per_connection))
+        self.base_url = base_url.rstrip("/")
+
+        self.flush_policy = flush_policy or FlushPolicy(max_age=flush_interval)
+        self.recorder = recorder
+        self.bar_builder = bar_builder
+        self._flush_listeners = []
 
-        self._buffer = []
+        self._decoder = TradeDecoder()
+        self._buffer = ShardedTickBuffer()
+        self._flush_requested = False
+        self._spill = None
+        self._spill_pending = False
+        if self.flush_policy.overflow == "spill":
+            self._spill = TickSpill(self.flush_policy.spill_dir)
+            self._spill_pending = bool(self._spill.pending())
+
+        self._metrics = {
+            "parse_errors": 0,
+            "dropped": 0,
+            "spilled": 0,
+            "flushes": 0,
+            "flushed_rows": 0,
+            "last_flush_rows": 0,
+            "last_flush_seconds": 0.0,
+            "max_flush_seconds": 0.0
+        }
         self._lock = threading.Lock()
+        self._flush_wanted = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
         self._running = False
         self._threads = []
+        self._flush_thread = None
+        self._sockets = []
 
     # ---------- WebSocket Callbacks ----------
 
     def _on_message(self, ws, message):
+        if self.recorder is not None:
+            self.recorder.record(message)
+
         try:
-            data = json.loads(message)
-            if data.get("e") != "trade":
-                return
+            trade = self._decoder.decode(message)
+        except TradeDecodeError:
+            with self._lock:
+                self._metrics["parse_errors"] += 1
+            return
+
+        if trade is None:
+            return
 
-            tick = {
-                "ts": datetime.fromtimestamp(data["T"] / 1000, tz=timezone.utc),
-                "symbol": data["s"].lower(),
-                "price": float(data["p"]),
-                "size": float(data["q"])
-            }
+        ts_ms, symbol, price, size, trade_id, is_buyer_maker = trade
 
-            with self._lock:
-                self._buffer.append(tick)
+        # Producers only take their symbol's shard lock; the shared lock is
+        # touched once per flush cycle to wake the flusher, or on overflow.
+        buffer = self._buffer
+        policy = self.flush_policy
+
+        if policy.is_full(buffer.rows):
+            self._make_room(symbol)
+
+        buffer.append(ts_ms, symbol, price, size, trade_id, is_buyer_maker)
 
-        except Exception:
-            pass
+        rows = buffer.rows
+        if not self._flush_requested and (rows == 1 or policy.size_due(rows, rows * ROW_BYTES)):
+            with self._lock:
+                self._flush_requested = True
+                self._request_flush()
 
     def _on_error(self, ws, error):
         print("WebSocket error:", error)
@@ -55,53 +118,211 @@ class BinanceWebSocketIngestor:
 
     # ---------- Worker Threads ----------
 
-    def _start_socket(self, symbol):
-        url = f"wss://fstream.binance.com/ws/{symbol}@trade"
+    def _stream_url(self, symbols):
+        if not self.combined:
+            return f"{self.base_url}/ws/{symbols[0]}@trade"
+
+        streams = "/".join(f"{sym}@trade" for sym in symbols)
+        return f"{self.base_url}/stream?streams={streams}"
+
+    def _connection_groups(self):
+        if not self.combined:
+            return [[sym] for sym in self.symbols]
+
+        n = self.symbols_per_connection
+        return [self.symbols[i:i + n] for i in range(0, len(self.symbols), n)]
+
+    def _start_socket(self, symbols):
         ws = websocket.WebSocketApp(
-            url,
+            self._stream_url(symbols),
             on_message=self._on_message,
             on_error=self._on_error,
             on_close=self._on_close,
             on_open=self._on_open
         )
+        self._sockets.append(ws)
         ws.run_forever()
 
+    # ---------- Flushing ----------
+
+    def _request_flush(self):
+        """
+        Wakes the flusher. Called with the lock held.
+        """
+        self._flush_wanted.notify()
+
+    def _make_room(self, symbol):
+        """
+        Applies the overflow strategy once the buffer has reached
+        max_buffer_rows. drop_oldest discards the oldest rows by ts across
+        all symbols, whichever symbol is arriving.
+        """
+        policy = self.flush_policy
+
+        if policy.overflow == "drop_oldest":
+            dropped = self._buffer.drop_oldest(policy.drop_count())
+            with self._lock:
+                self._metrics["dropped"] += dropped
+
+        elif policy.overflow == "spill":
+            columns = self._buffer.drain()
+            if columns is None:
+                return
+            self._spill.write(columns, list(self._buffer.symbols))
+            with self._lock:
+                self._metrics["spilled"] += len(columns["ts"])
+                self._spill_pending = True
+                self._request_flush()
+
+        else:
+            with self._lock:
+                self._request_flush()
+                while self._running and policy.is_full(self._buffer.rows):
+                    self._not_full.wait(policy.max_age)
+
+    def _flush_due(self):
+        buffer = self._buffer
+        if self._spill_pending:
+            return True
+        return self.flush_policy.due(buffer.rows, buffer.rows * ROW_BYTES, buffer.age())
+
     def _flush_loop(self):
+        policy = self.flush_policy
+
         while self._running:
-            time.sleep(self.flush_interval)
+            with self._lock:
+                self._flush_requested = False
+                while self._running and not self._flush_due():
+                    wait = policy.wait_time(self._buffer.rows, self._buffer.age())
+                    self._flush_wanted.wait(policy.max_age if wait is None else wait)
+                    self._flush_requested = False
             self._flush_buffer()
 
+    def _flush_spill(self):
+        with self._lock:
+            self._spill_pending = False
+
+        for path in self._spill.pending():
+            columns, symbols = self._spill.read(path)
+            self._write_batch(columns, symbols)
+            self._spill.remove(path)
+
     def _flush_buffer(self):
+        if self._spill_pending:
+            self._flush_spill()
+
+        columns = self._buffer.drain()
+
         with self._lock:
-            if not self._buffer:
-                return
-            df = pd.DataFrame(self._buffer)
-            self._buffer = []
+            self._not_full.notify_all()
+
+        if columns is not None:
+            self._write_batch(columns, list(self._buffer.symbols))
+
+    def _write_batch(self, columns, symbols):
+        start = time.perf_counter()
+        self.datastore.insert_tick_columns(columns, symbols)
+
+        if self.bar_builder is not None:
+            self.bar_builder.update(columns, symbols)
+            self._write_bars()
+
+        elapsed = time.perf_counter() - start
+
+        rows = len(columns["ts"])
+        with self._lock:
+            m = self._metrics
+            m["flushes"] += 1
+            m["flushed_rows"] += rows
+            m["last_flush_rows"] = rows
+            m["last_flush_seconds"] = elapsed
+            m["max_flush_seconds"] = max(m["max_flush_seconds"], elapsed)
+
+        for listener in self._flush_listeners:
+            listener(columns, symbols)
+
+    def _write_bars(self):
+        bars = self.bar_builder.drain()
+        if bars is not None:
+            self.datastore.upsert_ohlc(bars)
+        self.datastore.insert_revisions(
+            self.bar_builder.timeframe,
+            self.bar_builder.drain_revisions()
+        )
 
-        if not df.empty:
-            self.datastore.insert_ticks(df)
+    def _flush_final(self):
+        """
+        Writes what is still buffered and the bar builder's open bars. Runs
+        on stop, once no other thread flushes.
+        """
+        self._flush_buffer()
+        if self.bar_builder is not None:
+            self.bar_builder.finalize_open()
+            self._write_bars()
 
     # ---------- Public API ----------
 
+    def add_flush_listener(self, listener):
+        """
+        Registers listener(columns, symbols), called from the flush thread
+        after every batch has been written to storage.
+        """
+        self._flush_listeners.append(listener)
+
+    def get_metrics(self):
+        """
+        Snapshot of ingest counters: ticks accepted, messages dropped as
+        unparseable, overflow drops/spills, flush sizes and durations, the
+        current buffer depth and, with a bar builder, late ticks revised into
+        bars and those beyond the allowed lateness.
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics["ticks"] = self._buffer.ticks()
+        metrics["buffered"] = len(self._buffer)
+        metrics["buffered_bytes"] = self._buffer.nbytes
+        metrics["buffer_age_seconds"] = self._buffer.age()
+        metrics["json_backend"] = self._decoder.backend
+        if self.bar_builder is not None:
+            metrics["late_ticks"] = self.bar_builder.late_ticks
+            metrics["too_late_ticks"] = self.bar_builder.too_late_ticks
+        return metrics
+
     def start(self):
         if self._running:
             return
 
         self._running = True
 
-        # WebSocket threads (one per symbol)
-        for sym in self.symbols:
-            t = threading.Thread(target=self._start_socket, args=(sym,), daemon=True)
+        # WebSocket threads (one per symbol, or one per symbol group when combined)
+        for group in self._connection_groups():
+            t = threading.Thread(target=self._start_socket, args=(group,), daemon=True)
             t.start()
             self._threads.append(t)
 
         # Flush thread
-        flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
-        flush_thread.start()
-        self._threads.append(flush_thread)
+        self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flush_thread.start()
+        self._threads.append(self._flush_thread)
 
         print("Binance ingestion started.")
 
     def stop(self):
-        self._running = False
+        with self._lock:
+            self._running = False
+            self._flush_wanted.notify_all()
+            self._not_full.notify_all()
+
+        for ws in self._sockets:
+            ws.close()
+        self._sockets = []
+
+        if self._flush_thread is not None:
+            self._flush_thread.join(timeout=30)
+            self._flush_thread = None
+        self._flush_final()
+
+        if self.recorder is not None:
+            self.recorder.close()
+
         print("Binance ingestion stopped.")
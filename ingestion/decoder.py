@@ -0,0 +1,67 @@
+# ingestion/decoder.py
+
+import importlib
+import json
+
+from utils.config import JSON_BACKEND
+
+# Tried in order when no backend is configured; stdlib json is always available.
+JSON_BACKENDS = ("orjson", "ujson", "json")
+
+class TradeDecodeError(ValueError):
+    pass
+
+def load_json_backend(name=None):
+    """
+    Returns (name, loads) for the requested backend, or for the fastest
+    installed one when name is None.
+    """
+    if name is not None:
+        return name, importlib.import_module(name).loads
+
+    for candidate in JSON_BACKENDS:
+        try:
+            return candidate, importlib.import_module(candidate).loads
+        except ImportError:
+            continue
+
+    return "json", json.loads
+
+class TradeDecoder:
+    """
+    Decodes Binance trade events, raw or wrapped in a combined-stream envelope.
+
+    Only the fields the ingest path uses are pulled out. Timestamps stay as
+    epoch-ms integers; conversion happens in bulk at flush time.
+    """
+
+    def __init__(self, backend=JSON_BACKEND):
+        self.backend, self._loads = load_json_backend(backend)
+
+    def decode(self, message):
+        """
+        Returns (ts_ms, symbol, price, size, trade_id, is_buyer_maker) for a
+        trade event and None for any other event type.
+        Raises TradeDecodeError for malformed messages.
+        """
+        try:
+            data = self._loads(message)
+
+            inner = data.get("data")
+            if inner is not None:
+                data = inner
+
+            if data.get("e") != "trade":
+                return None
+
+            return (
+                data["T"],
+                data["s"],
+                float(data["p"]),
+                float(data["q"]),
+                data["t"],
+                data["m"]
+            )
+
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise TradeDecodeError(str(e)) from e
@@ -0,0 +1,72 @@
+# ingestion/flush_policy.py
+
+from utils.config import (
+    FLUSH_MAX_ROWS,
+    FLUSH_MAX_BYTES,
+    FLUSH_MAX_AGE,
+    MAX_BUFFER_ROWS,
+    BUFFER_OVERFLOW,
+    SPILL_DIR
+)
+
+OVERFLOW_STRATEGIES = ("block", "drop_oldest", "spill")
+
+class FlushPolicy:
+    """
+    Decides when the ingest buffer is written to storage and what happens when
+    it is full.
+
+    A flush fires on max_rows, max_bytes or max_age (seconds since the oldest
+    buffered tick), whichever comes first. The buffer is bounded at
+    max_buffer_rows; past that the overflow strategy applies:
+        block        producers wait until a flush makes room
+        drop_oldest  the oldest buffered ticks are discarded (and counted)
+        spill        the buffer is written to spill_dir and re-inserted later
+    """
+
+    def __init__(
+        self,
+        max_rows=FLUSH_MAX_ROWS,
+        max_bytes=FLUSH_MAX_BYTES,
+        max_age=FLUSH_MAX_AGE,
+        max_buffer_rows=MAX_BUFFER_ROWS,
+        overflow=BUFFER_OVERFLOW,
+        spill_dir=SPILL_DIR
+    ):
+        if overflow not in OVERFLOW_STRATEGIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_STRATEGIES}, got {overflow!r}")
+        if max_buffer_rows < max_rows:
+            raise ValueError("max_buffer_rows must be >= max_rows")
+
+        self.max_rows = int(max_rows)
+        self.max_bytes = int(max_bytes)
+        self.max_age = float(max_age)
+        self.max_buffer_rows = int(max_buffer_rows)
+        self.overflow = overflow
+        self.spill_dir = spill_dir
+
+    def size_due(self, rows, nbytes):
+        return rows >= self.max_rows or nbytes >= self.max_bytes
+
+    def due(self, rows, nbytes, age):
+        if not rows:
+            return False
+        return self.size_due(rows, nbytes) or age >= self.max_age
+
+    def wait_time(self, rows, age):
+        """
+        Seconds until the age trigger fires; None while the buffer is empty.
+        """
+        if not rows:
+            return None
+        return max(0.0, self.max_age - age)
+
+    def is_full(self, rows):
+        return rows >= self.max_buffer_rows
+
+    def drop_count(self):
+        """
+        Rows discarded per overflow under drop_oldest. Dropping in batches
+        keeps the overflow path O(1) per message.
+        """
+        return max(1, self.max_buffer_rows // 10)
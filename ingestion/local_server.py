@@ -0,0 +1,190 @@
+# ingestion/local_server.py
+#
+# Binance-compatible stand-in for offline load testing:
+#
+#   python -m ingestion.local_server --symbols 100 --rate 50 --profile burst
+#   BINANCE_WS_BASE_URL=ws://127.0.0.1:8765 streamlit run app.py
+#
+# Serves /ws/<symbol>@trade and /stream?streams=a@trade/b@trade, emitting
+# trade events in the futures payload format.
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+import websockets
+
+PROFILES = ("steady", "burst", "ramp")
+
+class LocalBinanceServer:
+    """
+    Emits `trade` events for every subscribed symbol at `rate` trades/s per
+    symbol, shaped by a burst profile:
+        steady  constant rate
+        burst   rate * burst_factor for burst_duration seconds every burst_every
+        ramp    rises linearly to rate * burst_factor over burst_every, repeats
+    Trade time (T) is stamped at send time, so consumers can measure latency.
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=8765,
+        rate=10.0,
+        profile="steady",
+        burst_factor=10.0,
+        burst_every=10.0,
+        burst_duration=1.0,
+        tick_interval=0.01,
+        seed=None
+    ):
+        if profile not in PROFILES:
+            raise ValueError(f"profile must be one of {PROFILES}, got {profile!r}")
+
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.profile = profile
+        self.burst_factor = burst_factor
+        self.burst_every = burst_every
+        self.burst_duration = burst_duration
+        self.tick_interval = tick_interval
+
+        self.sent = 0
+        self._rng = random.Random(seed)
+        self._trade_id = 0
+        self._prices = {}
+        self._started = time.monotonic()
+
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._stopped = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    # ---------- Event generation ----------
+
+    def rate_multiplier(self, t):
+        if self.profile == "burst":
+            return self.burst_factor if (t % self.burst_every) < self.burst_duration else 1.0
+        if self.profile == "ramp":
+            return 1.0 + (self.burst_factor - 1.0) * ((t % self.burst_every) / self.burst_every)
+        return 1.0
+
+    def _trade(self, symbol, now_ms):
+        price = self._prices.get(symbol, 100.0)
+        price = max(0.01, price * (1 + self._rng.gauss(0, 1e-4)))
+        self._prices[symbol] = price
+        self._trade_id += 1
+
+        return {
+            "e": "trade",
+            "E": now_ms,
+            "T": now_ms,
+            "s": symbol.upper(),
+            "t": self._trade_id,
+            "p": f"{price:.2f}",
+            "q": f"{self._rng.uniform(0.001, 2.0):.3f}",
+            "X": "MARKET",
+            "m": self._rng.random() < 0.5
+        }
+
+    @staticmethod
+    def _parse_path(path):
+        url = urlparse(path)
+        if url.path.startswith("/ws/"):
+            return [url.path[len("/ws/"):].split("@")[0]], False
+
+        streams = parse_qs(url.query).get("streams", [""])[0]
+        return [s.split("@")[0] for s in streams.split("/") if s], True
+
+    async def _handler(self, ws):
+        symbols, combined = self._parse_path(ws.request.path)
+        carry = 0.0
+        last = time.monotonic()
+
+        while ws.state is websockets.protocol.State.OPEN:
+            await asyncio.sleep(self.tick_interval)
+
+            now = time.monotonic()
+            carry += self.rate * self.rate_multiplier(now - self._started) * (now - last)
+            last = now
+
+            count = int(carry)
+            carry -= count
+            now_ms = int(time.time() * 1000)
+
+            try:
+                for _ in range(count):
+                    for sym in symbols:
+                        event = self._trade(sym, now_ms)
+                        if combined:
+                            event = {"stream": f"{sym}@trade", "data": event}
+                        await ws.send(json.dumps(event))
+                        self.sent += 1
+            except websockets.ConnectionClosed:
+                return
+
+    # ---------- Lifecycle ----------
+
+    async def _serve(self):
+        self._stopped = asyncio.Event()
+        async with websockets.serve(self._handler, self.host, self.port, max_queue=None):
+            self._ready.set()
+            await self._stopped.wait()
+
+    def serve_forever(self):
+        asyncio.run(self._serve())
+
+    def start(self):
+        """
+        Runs the server on a background thread and returns once it is listening.
+        """
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._serve())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        self._ready.wait(10)
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Binance trade stream stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=10.0, help="trades/s per symbol")
+    parser.add_argument("--profile", choices=PROFILES, default="steady")
+    parser.add_argument("--burst-factor", type=float, default=10.0)
+    parser.add_argument("--burst-every", type=float, default=10.0)
+    parser.add_argument("--burst-duration", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = LocalBinanceServer(
+        host=args.host,
+        port=args.port,
+        rate=args.rate,
+        profile=args.profile,
+        burst_factor=args.burst_factor,
+        burst_every=args.burst_every,
+        burst_duration=args.burst_duration
+    )
+    print(f"Serving Binance-format trades on {server.url} ({args.profile})")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
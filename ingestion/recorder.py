@@ -0,0 +1,168 @@
+# ingestion/recorder.py
+#
+# Raw frame capture and replay:
+#
+#   python -m ingestion.recorder replay data/frames --speed 10 --db data/replay.duckdb
+#
+# Segments are gzip files of length-prefixed records:
+#   <int64 receive time, ns since epoch> <uint32 payload length> <payload bytes>
+
+import argparse
+import gzip
+import struct
+import threading
+import time
+from pathlib import Path
+
+from utils.config import RECORDER_DIR, RECORDER_SEGMENT_BYTES
+
+RECORD_HEADER = struct.Struct("<qI")
+
+class FrameRecorder:
+    """
+    Appends every raw WebSocket frame, with its receive timestamp, to
+    compressed segment files in `directory`. A new segment is started once
+    the current one holds `segment_bytes` of uncompressed frames.
+
+    record() may be called from several socket threads; after close() it
+    drops frames instead of opening a new segment.
+    """
+
+    def __init__(self, directory=RECORDER_DIR, segment_bytes=RECORDER_SEGMENT_BYTES, compresslevel=1):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.compresslevel = compresslevel
+
+        self.frames = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._written = 0
+        self._closed = False
+
+    def _open_segment(self):
+        path = self.directory / f"frames-{time.time_ns()}.seg.gz"
+        self._file = gzip.open(path, "ab", compresslevel=self.compresslevel)
+        self._written = 0
+
+    def record(self, message, recv_ns=None):
+        if recv_ns is None:
+            recv_ns = time.time_ns()
+        if isinstance(message, str):
+            message = message.encode()
+
+        with self._lock:
+            if self._closed:
+                return
+            if self._file is None or self._written >= self.segment_bytes:
+                self._close_segment()
+                self._open_segment()
+
+            self._file.write(RECORD_HEADER.pack(recv_ns, len(message)))
+            self._file.write(message)
+            self._written += RECORD_HEADER.size + len(message)
+            self.frames += 1
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._close_segment()
+
+def read_segment(path):
+    """
+    Yields (recv_ns, payload) from one segment. A segment cut short by a crash
+    is read up to the last complete record.
+    """
+    with gzip.open(path, "rb") as f:
+        while True:
+            try:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    return
+                recv_ns, length = RECORD_HEADER.unpack(header)
+                payload = f.read(length)
+            except (EOFError, gzip.BadGzipFile):
+                return
+
+            if len(payload) < length:
+                return
+            yield recv_ns, payload
+
+class FrameReplayer:
+    """
+    Feeds recorded frames back through an ingestor's _on_message.
+
+    speed=1.0 replays in real time, speed=N runs N times faster and
+    speed=None replays as fast as possible. The ingestor does not need to be
+    started: the replayer flushes it inline whenever its flush policy says a
+    flush is due, so runs are reproducible.
+    """
+
+    def __init__(self, path):
+        path = Path(path)
+        self.segments = sorted(path.glob("*.seg.gz")) if path.is_dir() else [path]
+
+    def frames(self):
+        for segment in self.segments:
+            yield from read_segment(segment)
+
+    def replay(self, ingestor, speed=None):
+        """
+        Returns the number of frames replayed.
+        """
+        count = 0
+        first_ns = None
+        start = time.monotonic()
+
+        for recv_ns, payload in self.frames():
+            if speed:
+                if first_ns is None:
+                    first_ns = recv_ns
+                delay = (recv_ns - first_ns) / 1e9 / speed - (time.monotonic() - start)
+                if delay > 0:
+                    time.sleep(delay)
+
+            ingestor._on_message(None, payload)
+            count += 1
+
+            if ingestor._flush_due():
+                ingestor._flush_buffer()
+
+        ingestor._flush_buffer()
+        return count
+
+def rebuild_ticks(path, datastore, speed=None):
+    """
+    Replays a capture into `datastore`'s ticks table without touching the
+    exchange.
+    """
+    from ingestion.binance_ws import BinanceWebSocketIngestor
+
+    ingestor = BinanceWebSocketIngestor([], datastore)
+    frames = FrameReplayer(path).replay(ingestor, speed=speed)
+    return frames, ingestor.get_metrics()
+
+def main():
+    from storage.datastore import MarketDataStore
+
+    parser = argparse.ArgumentParser(description="Replay recorded Binance frames")
+    sub = parser.add_subparsers(dest="command", required=True)
+    replay = sub.add_parser("replay")
+    replay.add_argument("path", help="segment file or directory of segments")
+    replay.add_argument("--speed", type=float, default=None, help="1 = real time; omit for max speed")
+    replay.add_argument("--db", default="data/replay.duckdb")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    frames, metrics = rebuild_ticks(args.path, MarketDataStore(args.db), speed=args.speed)
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {frames} frames in {elapsed:.2f}s ({frames / max(elapsed, 1e-9):.0f}/s)")
+    print(f"Ticks: {metrics['ticks']}  parse errors: {metrics['parse_errors']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# ingestion/spill.py
+
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+class TickSpill:
+    """
+    Overflow area for drained tick columns. Each spill is one .npz file
+    holding the columns plus the symbol dictionary; files are read back in
+    the order they were written.
+    """
+
+    def __init__(self, spill_dir):
+        self.spill_dir = Path(spill_dir)
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+    def write(self, columns, symbols):
+        path = self.spill_dir / f"{time.time_ns()}.npz"
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, symbols=np.array(symbols, dtype=object), **columns)
+        os.replace(tmp, path)
+        return path
+
+    def pending(self):
+        return sorted(self.spill_dir.glob("*.npz"))
+
+    def read(self, path):
+        """
+        Returns (columns, symbols) for one spill file.
+        """
+        with np.load(path, allow_pickle=True) as f:
+            symbols = f["symbols"].tolist()
+            columns = {name: f[name] for name in f.files if name != "symbols"}
+        return columns, symbols
+
+    def remove(self, path):
+        Path(path).unlink(missing_ok=True)
@@ -0,0 +1,300 @@
+# ingestion/tick_buffer.py
+
+import threading
+import time
+
+import numpy as np
+
+from utils.config import DEFAULT_TICK_CHUNK_SIZE
+
+TICK_DTYPES = {
+    "ts": np.int64,         # epoch milliseconds (exchange trade time)
+    "symbol_id": np.int32,  # index into TickBuffer.symbols
+    "price": np.float64,
+    "size": np.float64,
+    "trade_id": np.int64,
+    "is_buyer_maker": np.bool_,  # true when the seller was the aggressor
+}
+
+ROW_BYTES = sum(np.dtype(dtype).itemsize for dtype in TICK_DTYPES.values())
+
+class TickBuffer:
+    """
+    Columnar tick buffer backed by preallocated NumPy chunks.
+
+    append() writes scalars into typed arrays instead of building a dict and a
+    datetime per trade. drain() hands the filled columns out as array views
+    (no copy unless the buffer spilled over into more than one chunk) and
+    starts a fresh chunk. Symbols are dictionary-encoded; codes are stable for
+    the lifetime of the buffer.
+    """
+
+    def __init__(self, chunk_size=DEFAULT_TICK_CHUNK_SIZE):
+        self.chunk_size = int(chunk_size)
+        self.symbols = []
+        self._codes = {}
+
+        self._chunks = []
+        self._first_append = None
+        self._new_chunk()
+
+    # ---------- Internals ----------
+
+    def _new_chunk(self):
+        self._cols = {name: np.empty(self.chunk_size, dtype) for name, dtype in TICK_DTYPES.items()}
+        self._ts = self._cols["ts"]
+        self._sym = self._cols["symbol_id"]
+        self._price = self._cols["price"]
+        self._size = self._cols["size"]
+        self._trade_id = self._cols["trade_id"]
+        self._maker = self._cols["is_buyer_maker"]
+        self._n = 0
+
+    def _seal_chunk(self):
+        self._chunks.append({name: col[:self._n] for name, col in self._cols.items()})
+        self._new_chunk()
+
+    def symbol_code(self, symbol):
+        """
+        Returns the integer code for a raw exchange symbol (e.g. 'BTCUSDT').
+        Symbols are stored lower-cased, matching the ticks table.
+        """
+        code = self._codes.get(symbol)
+        if code is None:
+            code = len(self.symbols)
+            self.symbols.append(symbol.lower())
+            self._codes[symbol] = code
+        return code
+
+    # ---------- Public API ----------
+
+    def append(self, ts_ms, symbol, price, size, trade_id=0, is_buyer_maker=False):
+        n = self._n
+        if self._first_append is None:
+            self._first_append = time.monotonic()
+        if n == self.chunk_size:
+            self._seal_chunk()
+            n = 0
+
+        code = self._codes.get(symbol)
+        if code is None:
+            code = self.symbol_code(symbol)
+
+        self._ts[n] = ts_ms
+        self._sym[n] = code
+        self._price[n] = price
+        self._size[n] = size
+        self._trade_id[n] = trade_id
+        self._maker[n] = is_buyer_maker
+        self._n = n + 1
+
+    def __len__(self):
+        return self._n + sum(len(c["ts"]) for c in self._chunks)
+
+    @property
+    def nbytes(self):
+        return len(self) * ROW_BYTES
+
+    def age(self):
+        """
+        Seconds since the oldest buffered tick was appended (0 when empty).
+        """
+        if self._first_append is None:
+            return 0.0
+        return time.monotonic() - self._first_append
+
+    def timestamps(self):
+        """
+        ts of every buffered row, in append order.
+        """
+        parts = [c["ts"] for c in self._chunks] + [self._ts[:self._n]]
+        return np.concatenate(parts)
+
+    def drop_oldest(self, n):
+        """
+        Discards up to n of the oldest rows and returns how many were dropped.
+        Whole chunks are released without copying.
+        """
+        if self._n:
+            self._seal_chunk()
+
+        dropped = 0
+        while self._chunks and dropped < n:
+            chunk = self._chunks[0]
+            size = len(chunk["ts"])
+            if dropped + size <= n:
+                self._chunks.pop(0)
+                dropped += size
+            else:
+                k = n - dropped
+                self._chunks[0] = {name: col[k:] for name, col in chunk.items()}
+                dropped = n
+
+        if not self._chunks:
+            self._first_append = None
+        return dropped
+
+    def drain(self):
+        """
+        Returns {column: ndarray} for everything buffered and resets the buffer.
+        """
+        self._seal_chunk()
+        chunks, self._chunks = self._chunks, []
+        self._first_append = None
+
+        if len(chunks) == 1:
+            return chunks[0]
+
+        return {
+            name: np.concatenate([c[name] for c in chunks])
+            for name in TICK_DTYPES
+        }
+
+class _Shard:
+    __slots__ = ("code", "lock", "active", "standby", "rows", "ticks")
+
+    def __init__(self, code, chunk_size):
+        self.code = code
+        self.lock = threading.Lock()
+        self.active = TickBuffer(chunk_size)
+        self.standby = TickBuffer(chunk_size)
+        self.rows = 0   # rows in active, updated under lock
+        self.ticks = 0
+
+class ShardedTickBuffer:
+    """
+    Per-symbol double-buffered TickBuffers.
+
+    Each symbol has its own lock and an active/standby pair. Producers only
+    touch their symbol's lock; drain() swaps the pair under that lock (a
+    pointer swap) and drains the standby side without holding it, so
+    producers never wait on the flusher.
+
+    `rows` sums per-shard counts that only change under their shard's lock,
+    so it never drifts; it drives the flush triggers and the buffer bound.
+    """
+
+    def __init__(self, chunk_size=DEFAULT_TICK_CHUNK_SIZE):
+        self.chunk_size = int(chunk_size)
+        self.symbols = []
+
+        self._shards = {}
+        self._shard_lock = threading.Lock()
+        self._drain_lock = threading.Lock()
+
+    def _add_shard(self, symbol):
+        with self._shard_lock:
+            shard = self._shards.get(symbol)
+            if shard is None:
+                shard = _Shard(len(self.symbols), self.chunk_size)
+                self.symbols.append(symbol.lower())
+                self._shards[symbol] = shard
+        return shard
+
+    # ---------- Producer side ----------
+
+    def append(self, ts_ms, symbol, price, size, trade_id=0, is_buyer_maker=False):
+        shard = self._shards.get(symbol)
+        if shard is None:
+            shard = self._add_shard(symbol)
+
+        with shard.lock:
+            shard.active.append(ts_ms, symbol, price, size, trade_id, is_buyer_maker)
+            shard.rows += 1
+            shard.ticks += 1
+
+    def drop_oldest(self, n):
+        """
+        Discards up to n of the oldest buffered rows across all symbols, by
+        ts, and returns how many were dropped. Each shard loses a prefix: a
+        symbol's trades arrive in ts order, so its oldest rows come first.
+
+        Holds every shard lock while it picks the rows; producers block
+        briefly, which is acceptable on the overflow path.
+        """
+        shards = list(self._shards.values())
+        for shard in shards:
+            shard.lock.acquire()
+        try:
+            stamps = [shard.active.timestamps() for shard in shards]
+            total = sum(len(ts) for ts in stamps)
+            n = min(n, total)
+            if n <= 0:
+                return 0
+
+            # The n-th smallest ts is the cutoff; rows tied with it are
+            # taken shard by shard until n are dropped
+            cutoff = np.partition(np.concatenate(stamps), n - 1)[n - 1]
+            counts = [int(np.count_nonzero(ts < cutoff)) for ts in stamps]
+            ties = n - sum(counts)
+            for i, ts in enumerate(stamps):
+                extra = min(ties, int(np.count_nonzero(ts == cutoff)))
+                counts[i] += extra
+                ties -= extra
+
+            dropped = 0
+            for shard, k in zip(shards, counts):
+                if k:
+                    k = shard.active.drop_oldest(k)
+                    shard.rows -= k
+                    dropped += k
+        finally:
+            for shard in shards:
+                shard.lock.release()
+
+        return dropped
+
+    # ---------- Inspection ----------
+
+    @property
+    def rows(self):
+        """
+        Rows buffered on the active side of every shard.
+        """
+        return sum(shard.rows for shard in list(self._shards.values()))
+
+    def __len__(self):
+        return sum(len(shard.active) for shard in list(self._shards.values()))
+
+    @property
+    def nbytes(self):
+        return len(self) * ROW_BYTES
+
+    def age(self):
+        return max((shard.active.age() for shard in list(self._shards.values())), default=0.0)
+
+    def ticks(self):
+        """
+        Total ticks ever appended, across all symbols.
+        """
+        return sum(shard.ticks for shard in list(self._shards.values()))
+
+    # ---------- Consumer side ----------
+
+    def drain(self):
+        """
+        Swaps every shard and returns {column: ndarray} for all buffered rows,
+        or None when nothing is buffered. symbol_id indexes self.symbols.
+        """
+        with self._drain_lock:
+            parts = []
+            for shard in list(self._shards.values()):
+                with shard.lock:
+                    shard.active, shard.standby = shard.standby, shard.active
+                    shard.rows = len(shard.active)
+
+                buffer = shard.standby
+                if len(buffer):
+                    columns = buffer.drain()
+                    columns["symbol_id"][:] = shard.code
+                    parts.append(columns)
+
+        if not parts:
+            return None
+        if len(parts) == 1:
+            return parts[0]
+
+        return {
+            name: np.concatenate([p[name] for p in parts])
+            for name in TICK_DTYPES
+        }
@@ -0,0 +1,206 @@
+# resampling/bar_builder.py
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.config import ALLOWED_LATENESS_MS, STREAMING_BAR_GRACE_MS
+
+class StreamingBarBuilder:
+    """
+    Incremental OHLCV builder fed from the ingest flush path.
+
+    Each flushed tick batch is grouped by (symbol, bucket) with NumPy and
+    merged into the open bar of each symbol, so every tick is aggregated once.
+    A bar is finalized when a tick for a later bucket arrives, or when the
+    wall clock is `grace_ms` past the bar's end. Finalized bars are collected
+    and handed out in batches by drain().
+
+    Ticks for buckets that were already finalized are late. Within
+    `allowed_lateness_ms` of the symbol's newest tick they are counted in
+    late_ticks and their buckets are handed out by drain_revisions(), for the
+    Resampler to rebuild from the stored ticks. Older ones are counted in
+    too_late_ticks and left out of the bars.
+
+    The first bar finalized for each symbol may be missing ticks stored
+    before this builder existed (a restart mid-bucket), so its bucket is
+    handed out by drain_revisions() as well. finalize_open() closes every
+    open bar when ingestion stops.
+    """
+
+    def __init__(
+        self,
+        timeframe="1s",
+        interval_ms=1000,
+        grace_ms=STREAMING_BAR_GRACE_MS,
+        allowed_lateness_ms=ALLOWED_LATENESS_MS
+    ):
+        self.timeframe = timeframe
+        self.interval_ms = interval_ms
+        self.grace_ms = grace_ms
+        self.allowed_lateness_ms = allowed_lateness_ms
+
+        self.late_ticks = 0
+        self.too_late_ticks = 0
+        self._event_time = {}    # symbol -> newest tick ts (ms) seen
+        self._revisions = set()  # (symbol, bucket_ms) with late ticks
+        self._emitted = set()    # symbols with a finalized bar
+        # symbol -> [bucket_ms, open, high, low, close, volume,
+        #            notional, trade_count, buy_volume, sell_volume,
+        #            first_ts_ms, last_ts_ms, first_trade_id, last_trade_id]
+        self._open = {}
+        self._closed_until = {}  # symbol -> end (ms) of the last finalized bucket
+        self._finished = []
+
+    def _finalize(self, symbol, bar):
+        self._finished.append((symbol, bar))
+        self._closed_until[symbol] = bar[0] + self.interval_ms
+        if symbol not in self._emitted:
+            self._emitted.add(symbol)
+            self._revisions.add((symbol, bar[0]))
+
+    def _late(self, symbol, bucket, n_ticks):
+        watermark = self._event_time.get(symbol, bucket) - self.allowed_lateness_ms
+        if bucket + self.interval_ms > watermark:
+            self.late_ticks += n_ticks
+            self._revisions.add((symbol, bucket))
+        else:
+            self.too_late_ticks += n_ticks
+
+    def _merge(self, symbol, bar, n_ticks):
+        current = self._open.get(symbol)
+
+        if bar[0] < self._closed_until.get(symbol, bar[0]):
+            self._late(symbol, bar[0], n_ticks)
+        elif current is None or bar[0] > current[0]:
+            if current is not None:
+                self._finalize(symbol, current)
+            self._open[symbol] = bar
+        elif bar[0] == current[0]:
+            # Out-of-order ticks within the bucket may move the open or
+            # close; trades sharing a ts are ordered by trade_id
+            if (bar[10], bar[12]) < (current[10], current[12]):
+                current[1], current[10], current[12] = bar[1], bar[10], bar[12]
+            if (bar[11], bar[13]) > (current[11], current[13]):
+                current[4], current[11], current[13] = bar[4], bar[11], bar[13]
+            current[2] = max(current[2], bar[2])
+            current[3] = min(current[3], bar[3])
+            for i in range(5, 10):
+                current[i] += bar[i]
+        else:
+            self._late(symbol, bar[0], n_ticks)
+
+    def update(self, columns, symbols, now_ms=None):
+        """
+        Folds a drained tick batch (ts in epoch ms, symbol_id into symbols)
+        into the open bars, then closes bars the wall clock has moved past.
+        """
+        ts = columns["ts"]
+        if len(ts):
+            bucket = ts - ts % self.interval_ms
+            order = np.lexsort((columns["trade_id"], ts, bucket, columns["symbol_id"]))
+            sid = columns["symbol_id"][order]
+            bucket = bucket[order]
+            price = columns["price"][order]
+            size = columns["size"][order]
+            sell = columns["is_buyer_maker"][order]
+            trade_id = columns["trade_id"][order]
+
+            # Advance each symbol's event time before merging, so lateness is
+            # judged against the newest tick including this batch
+            ts_sorted = ts[order]
+            sym_starts = np.flatnonzero(np.diff(sid, prepend=-1))
+            newest = np.maximum.reduceat(ts_sorted, sym_starts)
+            for code, t in zip(sid[sym_starts].tolist(), newest.tolist()):
+                symbol = symbols[code]
+                self._event_time[symbol] = max(self._event_time.get(symbol, t), t)
+
+            edges = np.flatnonzero((np.diff(sid) != 0) | (np.diff(bucket) != 0)) + 1
+            starts = np.concatenate(([0], edges))
+            ends = np.concatenate((edges, [len(ts)]))
+
+            highs = np.maximum.reduceat(price, starts)
+            lows = np.minimum.reduceat(price, starts)
+            volumes = np.add.reduceat(size, starts)
+            notionals = np.add.reduceat(price * size, starts)
+            sell_volumes = np.add.reduceat(np.where(sell, size, 0.0), starts)
+
+            for i, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+                bar = [
+                    int(bucket[start]),
+                    float(price[start]),
+                    float(highs[i]),
+                    float(lows[i]),
+                    float(price[end - 1]),
+                    float(volumes[i]),
+                    float(notionals[i]),
+                    end - start,
+                    float(volumes[i] - sell_volumes[i]),
+                    float(sell_volumes[i]),
+                    int(ts_sorted[start]),
+                    int(ts_sorted[end - 1]),
+                    int(trade_id[start]),
+                    int(trade_id[end - 1])
+                ]
+                self._merge(symbols[sid[start]], bar, end - start)
+
+        self.close_stale(now_ms)
+
+    def close_stale(self, now_ms=None):
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+
+        cutoff = now_ms - self.interval_ms - self.grace_ms
+        for symbol, bar in list(self._open.items()):
+            if bar[0] <= cutoff:
+                self._finalize(symbol, bar)
+                del self._open[symbol]
+
+    def finalize_open(self):
+        """
+        Finalizes every open bar, for drain() to hand out.
+        """
+        for symbol, bar in list(self._open.items()):
+            self._finalize(symbol, bar)
+        self._open = {}
+
+    def drain_revisions(self):
+        """
+        Returns [(symbol, bucket ts)] of finalized bars that received late
+        ticks since the last call, and clears them.
+        """
+        if not self._revisions:
+            return []
+
+        revisions, self._revisions = sorted(self._revisions), set()
+        return [(symbol, pd.Timestamp(bucket, unit="ms")) for symbol, bucket in revisions]
+
+    def drain(self):
+        """
+        Returns finalized bars as an ohlc-shaped DataFrame (or None) and
+        clears them.
+        """
+        if not self._finished:
+            return None
+
+        finished, self._finished = self._finished, []
+        bars = np.array([bar for _, bar in finished], dtype=np.float64)
+        vwap = np.full(len(bars), np.nan)
+        np.divide(bars[:, 6], bars[:, 5], out=vwap, where=bars[:, 5] != 0)
+
+        return pd.DataFrame({
+            "ts": pd.to_datetime(bars[:, 0].astype(np.int64), unit="ms"),
+            "symbol": [symbol for symbol, _ in finished],
+            "timeframe": self.timeframe,
+            "open": bars[:, 1],
+            "high": bars[:, 2],
+            "low": bars[:, 3],
+            "close": bars[:, 4],
+            "volume": bars[:, 5],
+            "vwap": vwap,
+            "trade_count": bars[:, 7].astype(np.int64),
+            "buy_volume": bars[:, 8],
+            "sell_volume": bars[:, 9],
+            "is_final": True
+        })
@@ -3,56 +3,757 @@
 import duckdb
 import pandas as pd
 
+from utils.config import ALLOWED_LATENESS_MS, TOO_LATE_HORIZON_MS
+
 TIMEFRAME_MAP = {
     "1s": "1 second",
     "1m": "1 minute",
-    "5m": "5 minutes"
+    "5m": "5 minutes",
+    "15m": "15 minutes",
+    "1h": "1 hour",
+    "4h": "4 hours",
+    "1d": "1 day"
+}
+
+# Each timeframe is aggregated from the next finer bar series; 1s from ticks.
+TIMEFRAME_SOURCE = {
+    "1s": None,
+    "1m": "1s",
+    "5m": "1m",
+    "15m": "5m",
+    "1h": "15m",
+    "4h": "1h",
+    "1d": "4h"
+}
+
+BASE_TIMEFRAME = "1s"
+
+# Tick order for open/close: ts, then trade_id for trades sharing a
+# timestamp (as StreamingBarBuilder does). Packed into one HUGEINT, which
+# aggregates far faster than a (ts, trade_id) struct key.
+_TICK_ORDER = "epoch_us(s.ts)::HUGEINT * 18446744073709551616 + s.trade_id"
+
+# Aggregates per source: raw ticks, or bars of the source timeframe.
+# is_buyer_maker means the seller was the aggressor, i.e. sell volume.
+_TICK_SOURCE = {
+    "table": "ticks",
+    "filter": "",
+    "open": f"arg_min(s.price, {_TICK_ORDER})",
+    "high": "max(s.price)",
+    "low": "min(s.price)",
+    "close": f"arg_max(s.price, {_TICK_ORDER})",
+    "volume": "sum(s.size)",
+    "vwap": "sum(s.price * s.size) / nullif(sum(s.size), 0)",
+    "trade_count": "count(*)",
+    "buy_volume": "coalesce(sum(s.size) FILTER (WHERE NOT s.is_buyer_maker), 0)",
+    "sell_volume": "coalesce(sum(s.size) FILTER (WHERE s.is_buyer_maker), 0)"
 }
 
+_BAR_SOURCE = {
+    "table": "ohlc",
+    "filter": "AND s.timeframe = ?",
+    "open": "arg_min(s.open, s.ts)",
+    "high": "max(s.high)",
+    "low": "min(s.low)",
+    "close": "arg_max(s.close, s.ts)",
+    "volume": "sum(s.volume)",
+    "vwap": "sum(s.vwap * s.volume) / nullif(sum(s.volume), 0)",
+    "trade_count": "sum(s.trade_count)",
+    "buy_volume": "sum(s.buy_volume)",
+    "sell_volume": "sum(s.sell_volume)"
+}
+
+_BAR_COLUMNS = "ts, symbol, timeframe, open, high, low, close, volume, vwap, trade_count, buy_volume, sell_volume, is_final"
+
+# Information-driven bars: a bar closes once the running sum of its measure
+# reaches the threshold. Stored in ohlc under keys like "tick_1000",
+# "volume_50" or "dollar_1000000" in place of a timeframe.
+INFO_BAR_MEASURES = {
+    "tick": "1",
+    "volume": "s.size",
+    "dollar": "s.price * s.size"
+}
+
+def parse_info_bar(key):
+    """
+    Returns (bar_type, threshold) for an information-bar key, or None for a
+    time-bar timeframe.
+    """
+    bar_type, _, threshold = key.partition("_")
+    if bar_type not in INFO_BAR_MEASURES or not threshold:
+        return None
+    return bar_type, float(threshold)
+
+def timeframe_chain(timeframe):
+    """
+    Timeframes needed to build `timeframe`, finest first.
+    """
+    if parse_info_bar(timeframe):
+        return [timeframe]
+
+    chain = []
+    while timeframe is not None:
+        chain.append(timeframe)
+        timeframe = TIMEFRAME_SOURCE[timeframe]
+    return chain[::-1]
+
 class Resampler:
-    def __init__(self, datastore):
-        self.con = datastore.con
+    """
+    Incremental, cascading, batched OHLC resampler.
+
+    1s bars are aggregated from ticks; every coarser timeframe is aggregated
+    from the next finer bar series (1m from 1s, 5m from 1m, ...), so the tick
+    table is scanned once per cycle regardless of how many timeframes exist.
+    Each timeframe is resampled for all requested symbols at once: a handful
+    of statements per level, independent of the number of symbols.
+
+    Progress is persisted per (symbol, timeframe) in resample_state: the
+    newest tick reflected in that timeframe (tick_watermark, propagated up
+    the cascade) and the bucket that is still open. Each pass reads only
+    source rows from the open bucket onwards and upserts that bucket's bar
+    and bars for any newer buckets on the ohlc (symbol, timeframe, ts) key. Every bar before the newest bucket is
+    written with is_final = true and never touched again.
+
+    build_base=False leaves 1s bars to another producer (the ingestion-side
+    StreamingBarBuilder) and only builds the coarser levels from them.
+
+    Information-driven bars (tick, volume and dollar; see INFO_BAR_MEASURES)
+    are built from ticks with the same open-bar bookkeeping. A bar owns every
+    tick up to the point where the running measure crosses its threshold;
+    ticks sharing a timestamp never straddle two bars, so the open bar can be
+    rebuilt from its first timestamp. The overshoot of the last closed bar is
+    carried in resample_state.carry and counts towards the next one.
+
+    Late ticks are handled through the bar_revisions queue. With
+    build_base=False the ingest path (StreamingBarBuilder) queues base bars
+    that received ticks within the allowed lateness after they were written;
+    with build_base=True each pass compares the finalized 1s bars within
+    `allowed_lateness_ms` of the tick watermark against their stored ticks
+    and queues those whose trade count changed, counting the new ticks in
+    late_ticks. Ticks found the same way in bars up to `too_late_horizon_ms`
+    further back are counted in too_late_ticks and left out of the bars.
+    Each pass rebuilds exactly the queued buckets from their source and
+    queues the enclosing bucket one level up, so a revision travels the
+    cascade without touching other bars.
+    Information bars only take late ticks into their open bar.
+    """
+
+    def __init__(
+        self,
+        datastore,
+        build_base=True,
+        allowed_lateness_ms=ALLOWED_LATENESS_MS,
+        too_late_horizon_ms=TOO_LATE_HORIZON_MS
+    ):
+        self.datastore = datastore
+        self.build_base = build_base
+        self.allowed_lateness_ms = allowed_lateness_ms
+        self.too_late_horizon_ms = too_late_horizon_ms
+
+        self.late_ticks = 0
+        self.too_late_ticks = 0
+        self._too_late_seen = {}  # (symbol, bucket) -> stored ticks already counted
+
+    @property
+    def con(self):
+        # Per-thread cursor: resampling never shares a handle with ingest writes
+        return self.datastore.cursor()
+
+    @property
+    def _write_lock(self):
+        # Held for each write transaction, so ohlc upserts and the
+        # bar_revisions queue never race the ingest flush (1s bars,
+        # revisions) and a CHECKPOINT never lands mid-transaction. Sources
+        # are aggregated into TEMP tables beforehand, so it only covers
+        # copying finished rows into the shared tables
+        return self.datastore.connections.write_lock
+
+    def _states(self, con, symbols, timeframe):
+        """
+        Returns {symbol: (tick_watermark, open_bucket, bootstrap)}.
+
+        Without saved state, a pair that already has bars (written before
+        watermarks existed) restarts from its latest bar, which is rebuilt;
+        otherwise the whole source history is aggregated.
+        """
+        states = {
+            sym: (wm, bucket, False)
+            for sym, wm, bucket in con.execute(
+                """
+                SELECT symbol, tick_watermark, open_bucket
+                FROM resample_state
+                WHERE timeframe = ? AND list_contains(?, symbol)
+                """,
+                [timeframe, symbols]
+            ).fetchall()
+        }
+
+        missing = [sym for sym in symbols if sym not in states]
+        if missing:
+            latest = dict(con.execute(
+                """
+                SELECT symbol, MAX(ts)
+                FROM ohlc
+                WHERE timeframe = ? AND list_contains(?, symbol)
+                GROUP BY symbol
+                """,
+                [timeframe, missing]
+            ).fetchall())
+            for sym in missing:
+                states[sym] = (None, latest.get(sym), True)
+
+        return states
+
+    def _new_watermarks(self, con, symbols, source_tf, source, states):
+        """
+        Returns {symbol: newest source position not yet reflected}.
+
+        For a resampled source the position is the source's own tick
+        watermark: its open bar can change without any new bar appearing, and
+        that must still propagate. Ticks, and bars from an external producer
+        (which are final when written), are tracked by MAX(ts) in one scan of
+        the new range for all symbols.
+        """
+        latest = {}
+        scan = list(symbols)
+
+        if source_tf is not None:
+            latest = dict(con.execute(
+                """
+                SELECT symbol, tick_watermark
+                FROM resample_state
+                WHERE timeframe = ? AND list_contains(?, symbol)
+                """,
+                [source_tf, scan]
+            ).fetchall())
+            scan = [sym for sym in scan if sym not in latest]
+
+        if scan:
+            marks = [states[sym][0] for sym in scan]
+            lower = "AND s.ts > ?" if None not in marks else ""
+            params = [scan] + ([source_tf] if source_tf else []) + ([min(marks)] if lower else [])
+
+            latest.update(con.execute(
+                f"""
+                SELECT s.symbol, MAX(s.ts)
+                FROM {source['table']} s
+                WHERE list_contains(?, s.symbol)
+                {source['filter']}
+                {lower}
+                GROUP BY s.symbol
+                """,
+                params
+            ).fetchall())
+
+        return {
+            sym: ts for sym, ts in latest.items()
+            if ts is not None and (states[sym][0] is None or ts > states[sym][0])
+        }
+
+    def _resample_level(self, symbols, timeframe):
+        interval = TIMEFRAME_MAP[timeframe]
+        source_tf = TIMEFRAME_SOURCE[timeframe]
+        source = _TICK_SOURCE if source_tf is None else _BAR_SOURCE
+        con = self.con
+
+        states = self._states(con, symbols, timeframe)
+        new_marks = self._new_watermarks(con, symbols, source_tf, source, states)
+        if not new_marks:
+            return 0
+
+        plan = sorted(new_marks)
+        lowers = [states[sym][1] for sym in plan]
+
+        # Constant lower bound on the source scan so zonemaps can skip history
+        scan_lower = ""
+        scan_params = []
+        if None not in lowers:
+            scan_lower = "AND s.ts >= ?"
+            scan_params = [min(lowers)]
+
+        # The plan and the new bars go to connection-local TEMP tables
+        # outside write_lock; only the copy into ohlc and the state update
+        # below hold it, so ingest writes never wait on the aggregation
+        con.execute(
+            """
+            CREATE OR REPLACE TEMP TABLE resample_plan AS
+            SELECT
+                unnest(?::VARCHAR[]) AS symbol,
+                unnest(?::TIMESTAMP[]) AS lower_ts,
+                unnest(?::TIMESTAMP[]) AS new_watermark,
+                unnest(?::BOOLEAN[]) AS bootstrap
+            """,
+            [plan, lowers, [new_marks[sym] for sym in plan], [states[sym][2] for sym in plan]]
+        )
+
+        # Every bucket from lower_ts is rewritten in place on the
+        # (symbol, timeframe, ts) key: the open bar, and on bootstrap any
+        # legacy bars from before watermarks
+        con.execute(
+            f"""
+            CREATE OR REPLACE TEMP TABLE resample_bars AS
+            SELECT
+                time_bucket(INTERVAL '{interval}', s.ts) AS ts,
+                s.symbol,
+                ? AS timeframe,
+                {source['open']} AS open,
+                {source['high']} AS high,
+                {source['low']} AS low,
+                {source['close']} AS close,
+                {source['volume']} AS volume,
+                {source['vwap']} AS vwap,
+                {source['trade_count']} AS trade_count,
+                {source['buy_volume']} AS buy_volume,
+                {source['sell_volume']} AS sell_volume,
+                time_bucket(INTERVAL '{interval}', s.ts)
+                    < time_bucket(INTERVAL '{interval}', p.new_watermark) AS is_final
+            FROM {source['table']} s
+            JOIN resample_plan p ON s.symbol = p.symbol
+            WHERE s.ts <= p.new_watermark
+            AND (p.lower_ts IS NULL OR s.ts >= p.lower_ts)
+            {source['filter']}
+            {scan_lower}
+            GROUP BY 1, 2, p.new_watermark
+            ORDER BY 2, 1
+            """,
+            [timeframe] + ([source_tf] if source_tf else []) + scan_params
+        )
+
+        with self._write_lock:
+            con.begin()
+            try:
+                # Bars before a bootstrapped pair's restart point predate
+                # watermarks and are never rebuilt, so they are final
+                con.execute(
+                    """
+                    UPDATE ohlc
+                    SET is_final = true
+                    FROM resample_plan p
+                    WHERE p.bootstrap
+                    AND ohlc.symbol = p.symbol
+                    AND ohlc.timeframe = ?
+                    AND ohlc.ts < p.lower_ts
+                    AND ohlc.is_final IS NOT TRUE
+                    """,
+                    [timeframe]
+                )
+
+                written = con.execute(
+                    f"INSERT OR REPLACE INTO ohlc ({_BAR_COLUMNS}) SELECT {_BAR_COLUMNS} FROM resample_bars"
+                ).fetchone()[0]
 
-    def _latest_bar_time(self, symbol, timeframe):
-        result = self.con.execute(
+                con.execute(
+                    f"""
+                    INSERT OR REPLACE INTO resample_state (symbol, timeframe, tick_watermark, open_bucket)
+                    SELECT
+                        symbol,
+                        ?,
+                        new_watermark,
+                        time_bucket(INTERVAL '{interval}', new_watermark)
+                    FROM resample_plan
+                    """,
+                    [timeframe]
+                )
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+
+        return written
+
+    def _queue_late_ticks(self, symbols):
+        """
+        Queues the finalized base bars that late ticks have landed in since
+        they were written: buckets behind open_bucket, within the allowed
+        lateness of the tick watermark, whose stored tick count no longer
+        matches the bar's trade_count. Mismatched buckets further back, up to
+        the too-late horizon, are only counted. Returns the number of bars
+        queued.
+        """
+        con = self.con
+        states = self._states(con, symbols, BASE_TIMEFRAME)
+        marks = [wm for wm, _, bootstrap in states.values() if not bootstrap]
+        if not marks:
+            return 0
+
+        interval = TIMEFRAME_MAP[BASE_TIMEFRAME]
+        reach = self.allowed_lateness_ms + self.too_late_horizon_ms
+        lower = pd.Timestamp(min(marks)) - pd.Timedelta(milliseconds=reach)
+
+        # Whole buckets only, so a bucket cut by a window edge never
+        # looks short of ticks
+        con.execute(
+            f"""
+            CREATE OR REPLACE TEMP TABLE late_buckets AS
+            SELECT
+                t.symbol,
+                t.bucket,
+                t.n,
+                coalesce(b.trade_count, 0) AS trade_count,
+                t.bucket >= time_bucket(INTERVAL '{interval}', t.tick_watermark - to_milliseconds(?)) AS revise
+            FROM (
+                SELECT
+                    s.symbol,
+                    time_bucket(INTERVAL '{interval}', s.ts) AS bucket,
+                    st.tick_watermark,
+                    count(*) AS n
+                FROM ticks s
+                JOIN resample_state st ON st.symbol = s.symbol AND st.timeframe = ?
+                WHERE list_contains(?, s.symbol)
+                AND s.ts >= time_bucket(INTERVAL '{interval}', st.tick_watermark - to_milliseconds(?))
+                AND s.ts < st.open_bucket
+                AND s.ts >= ?
+                GROUP BY 1, 2, 3
+            ) t
+            LEFT JOIN ohlc b
+                ON b.symbol = t.symbol AND b.timeframe = ? AND b.ts = t.bucket
+            WHERE b.trade_count IS DISTINCT FROM t.n
+            """,
+            [
+                self.allowed_lateness_ms,
+                BASE_TIMEFRAME,
+                list(symbols),
+                reach,
+                lower.floor("s"),
+                BASE_TIMEFRAME
+            ]
+        )
+
+        # A too-late bucket stays mismatched; only ticks beyond those
+        # already counted are new
+        seen = self._too_late_seen
+        for sym, bucket, n, trade_count in con.execute(
+            "SELECT symbol, bucket, n, trade_count FROM late_buckets WHERE NOT revise"
+        ).fetchall():
+            self.too_late_ticks += max(n - max(trade_count, seen.get((sym, bucket), 0)), 0)
+            seen[(sym, bucket)] = n
+        for key in [k for k in seen if k[1] < lower]:
+            del seen[key]
+
+        self.late_ticks += con.execute(
+            "SELECT coalesce(sum(greatest(n - trade_count, 0)), 0) FROM late_buckets WHERE revise"
+        ).fetchone()[0]
+
+        with self._write_lock:
+            return con.execute(
+                """
+                INSERT INTO bar_revisions (symbol, timeframe, ts)
+                SELECT symbol, ?, bucket FROM late_buckets WHERE revise
+                """,
+                [BASE_TIMEFRAME]
+            ).fetchone()[0]
+
+    def _revise_level(self, symbols, timeframe, children):
+        """
+        Rebuilds the bars of `timeframe` queued in bar_revisions from their
+        source and queues the enclosing bars of each timeframe in `children`.
+        Returns the number of bars rewritten.
+        """
+        interval = TIMEFRAME_MAP[timeframe]
+        source_tf = TIMEFRAME_SOURCE[timeframe]
+        source = _TICK_SOURCE if source_tf is None else _BAR_SOURCE
+        con = self.con
+
+        # Claimed revisions, counted per key: a key queued again after this
+        # read has more rows by the time of the DELETE and stays queued
+        con.execute(
             """
-            SELECT MAX(ts)
-            FROM ohlc
-            WHERE symbol = ? AND timeframe = ?
+            CREATE OR REPLACE TEMP TABLE revision_keys AS
+            SELECT symbol, ts, count(*) AS n
+            FROM bar_revisions
+            WHERE timeframe = ? AND list_contains(?, symbol)
+            GROUP BY 1, 2
             """,
-            [symbol, timeframe]
+            [timeframe, symbols]
+        )
+        pending = con.execute(
+            f"""
+            CREATE OR REPLACE TEMP TABLE revision_plan AS
+            SELECT DISTINCT
+                r.symbol,
+                time_bucket(INTERVAL '{interval}', r.ts) AS bucket,
+                coalesce(time_bucket(INTERVAL '{interval}', r.ts) < st.open_bucket, true) AS is_final
+            FROM revision_keys r
+            LEFT JOIN resample_state st
+                ON st.symbol = r.symbol AND st.timeframe = ?
+            """,
+            [timeframe]
         ).fetchone()[0]
+        if not pending:
+            return 0
+
+        con.execute(
+            f"""
+            CREATE OR REPLACE TEMP TABLE revision_bars AS
+            SELECT
+                p.bucket AS ts,
+                s.symbol,
+                ? AS timeframe,
+                {source['open']} AS open,
+                {source['high']} AS high,
+                {source['low']} AS low,
+                {source['close']} AS close,
+                {source['volume']} AS volume,
+                {source['vwap']} AS vwap,
+                {source['trade_count']} AS trade_count,
+                {source['buy_volume']} AS buy_volume,
+                {source['sell_volume']} AS sell_volume,
+                p.is_final
+            FROM {source['table']} s
+            JOIN revision_plan p
+                ON s.symbol = p.symbol
+                AND s.ts >= p.bucket
+                AND s.ts < p.bucket + INTERVAL '{interval}'
+            WHERE s.ts >= (SELECT MIN(bucket) FROM revision_plan)
+            {source['filter']}
+            GROUP BY p.bucket, s.symbol, p.is_final
+            """,
+            [timeframe] + ([source_tf] if source_tf else [])
+        )
+
+        with self._write_lock:
+            con.begin()
+            try:
+                written = con.execute(
+                    f"INSERT OR REPLACE INTO ohlc ({_BAR_COLUMNS}) SELECT {_BAR_COLUMNS} FROM revision_bars"
+                ).fetchone()[0]
+
+                for child in children:
+                    con.execute(
+                        "INSERT INTO bar_revisions SELECT symbol, ?, bucket FROM revision_plan",
+                        [child]
+                    )
+
+                con.execute(
+                    """
+                    DELETE FROM bar_revisions
+                    USING revision_keys k
+                    WHERE bar_revisions.timeframe = ?
+                    AND bar_revisions.symbol = k.symbol
+                    AND bar_revisions.ts = k.ts
+                    AND k.n = (
+                        SELECT count(*)
+                        FROM bar_revisions c
+                        WHERE c.timeframe = ? AND c.symbol = k.symbol AND c.ts = k.ts
+                    )
+                    """,
+                    [timeframe, timeframe]
+                )
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+
+        return written
+
+    def _resample_info_level(self, symbols, key):
+        bar_type, threshold = parse_info_bar(key)
+        measure = INFO_BAR_MEASURES[bar_type]
+        con = self.con
+
+        states = self._states(con, symbols, key)
+        new_marks = self._new_watermarks(con, symbols, None, _TICK_SOURCE, states)
+        if not new_marks:
+            return 0
 
-        return result
+        plan = sorted(new_marks)
+        lowers = [states[sym][1] for sym in plan]
+        carries = dict(con.execute(
+            "SELECT symbol, carry FROM resample_state WHERE timeframe = ? AND list_contains(?, symbol)",
+            [key, plan]
+        ).fetchall())
+
+        scan_lower = ""
+        scan_params = []
+        if None not in lowers:
+            scan_lower = "AND s.ts >= ?"
+            scan_params = [min(lowers)]
+
+        # Plan and bars are built in TEMP tables outside write_lock, as in
+        # _resample_level
+        con.execute(
+            """
+            CREATE OR REPLACE TEMP TABLE resample_plan AS
+            SELECT
+                unnest(?::VARCHAR[]) AS symbol,
+                unnest(?::TIMESTAMP[]) AS lower_ts,
+                unnest(?::TIMESTAMP[]) AS new_watermark,
+                unnest(?::BOOLEAN[]) AS bootstrap,
+                unnest(?::DOUBLE[]) AS carry
+            """,
+            [
+                plan,
+                lowers,
+                [new_marks[sym] for sym in plan],
+                [states[sym][2] for sym in plan],
+                [carries.get(sym) or 0.0 for sym in plan]
+            ]
+        )
+
+        # RANGE framing gives every tick of a timestamp the same running
+        # total, so a timestamp always lands in a single bar
+        con.execute(
+            f"""
+            CREATE OR REPLACE TEMP TABLE info_bars AS
+            WITH running AS (
+                SELECT
+                    s.symbol,
+                    s.ts,
+                    s.price,
+                    s.size,
+                    s.trade_id,
+                    s.is_buyer_maker,
+                    p.carry + sum({measure}) OVER (
+                        PARTITION BY s.symbol ORDER BY s.ts
+                        RANGE BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+                    ) AS cum
+                FROM ticks s
+                JOIN resample_plan p ON s.symbol = p.symbol
+                WHERE s.ts <= p.new_watermark
+                AND (p.lower_ts IS NULL OR s.ts >= p.lower_ts)
+                {scan_lower}
+            ),
+            bars AS (
+                SELECT
+                    s.symbol,
+                    ceil(s.cum / ?) AS bar_id,
+                    min(s.ts) AS ts,
+                    {_TICK_SOURCE['open']} AS open,
+                    {_TICK_SOURCE['high']} AS high,
+                    {_TICK_SOURCE['low']} AS low,
+                    {_TICK_SOURCE['close']} AS close,
+                    {_TICK_SOURCE['volume']} AS volume,
+                    {_TICK_SOURCE['vwap']} AS vwap,
+                    {_TICK_SOURCE['trade_count']} AS trade_count,
+                    {_TICK_SOURCE['buy_volume']} AS buy_volume,
+                    {_TICK_SOURCE['sell_volume']} AS sell_volume,
+                    max(s.cum) AS cum_end
+                FROM running s
+                GROUP BY 1, 2
+            )
+            SELECT
+                *,
+                bar_id < max(bar_id) OVER (PARTITION BY symbol) AS is_final
+            FROM bars
+            """,
+            scan_params + [threshold]
+        )
+
+        with self._write_lock:
+            con.begin()
+            try:
+                # Bars before a bootstrapped pair's restart point predate
+                # watermarks and are never rebuilt, so they are final
+                con.execute(
+                    """
+                    UPDATE ohlc
+                    SET is_final = true
+                    FROM resample_plan p
+                    WHERE p.bootstrap
+                    AND ohlc.symbol = p.symbol
+                    AND ohlc.timeframe = ?
+                    AND ohlc.ts < p.lower_ts
+                    AND ohlc.is_final IS NOT TRUE
+                    """,
+                    [key]
+                )
+
+                con.execute(
+                    """
+                    DELETE FROM ohlc
+                    USING resample_plan p
+                    WHERE ohlc.symbol = p.symbol
+                    AND ohlc.timeframe = ?
+                    AND ohlc.ts >= p.lower_ts
+                    AND (p.bootstrap OR NOT ohlc.is_final)
+                    """,
+                    [key]
+                )
+
+                written = con.execute(
+                    f"""
+                    INSERT INTO ohlc ({_BAR_COLUMNS})
+                    SELECT
+                        ts, symbol, ?, open, high, low, close, volume,
+                        vwap, trade_count, buy_volume, sell_volume, is_final
+                    FROM info_bars
+                    ORDER BY symbol, ts
+                    """,
+                    [key]
+                ).fetchone()[0]
+
+                # The open bar starts at its first tick; the measure accumulated
+                # up to it, less whole thresholds, carries over
+                con.execute(
+                    """
+                    INSERT OR REPLACE INTO resample_state (symbol, timeframe, tick_watermark, open_bucket, carry)
+                    SELECT
+                        p.symbol,
+                        ?,
+                        p.new_watermark,
+                        b.open_ts,
+                        coalesce(fmod(b.closed_cum, ?), p.carry)
+                    FROM resample_plan p
+                    JOIN (
+                        SELECT
+                            symbol,
+                            max(ts) FILTER (WHERE NOT is_final) AS open_ts,
+                            max(cum_end) FILTER (WHERE is_final) AS closed_cum
+                        FROM info_bars
+                        GROUP BY symbol
+                    ) b ON b.symbol = p.symbol
+                    """,
+                    [key, threshold]
+                )
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+
+        return written
 
     def resample(self, symbol, timeframe):
-        interval = TIMEFRAME_MAP[timeframe]
-        last_ts = self._latest_bar_time(symbol, timeframe)
-
-        where_clause = ""
-        params = [symbol]
-
-        if last_ts is not None:
-            where_clause = "AND ts > ?"
-            params.append(last_ts)
-
-        query = f"""
-        INSERT INTO ohlc
-        SELECT
-            time_bucket(INTERVAL '{interval}', ts) AS ts,
-            symbol,
-            '{timeframe}' AS timeframe,
-            arg_min(price, ts) AS open,
-            max(price) AS high,
-            min(price) AS low,
-            arg_max(price, ts) AS close,
-            sum(size) AS volume
-        FROM ticks
-        WHERE symbol = ?
-        {where_clause}
-        GROUP BY 1, 2
-        ORDER BY 1
-        """
-
-
-        self.con.execute(query, params)
+        """
+        Brings `timeframe` (and the finer levels it is built from) up to date
+        for one symbol and returns the number of bars written at that
+        timeframe.
+        """
+        return self.resample_batch([symbol], [timeframe])[timeframe]
+
+    def resample_batch(self, symbols, timeframes):
+        """
+        Brings every timeframe in `timeframes` (and the finer levels they are
+        built from) up to date for all `symbols`, finest first, each level in
+        one pass over its new source range. Information-bar keys are built
+        from ticks after the time levels. Returns {timeframe: bars written}.
+        """
+        needed = set()
+        for tf in timeframes:
+            needed.update(timeframe_chain(tf))
+
+        written = {}
+        for tf in TIMEFRAME_MAP:
+            if tf not in needed:
+                continue
+
+            children = [child for child, src in TIMEFRAME_SOURCE.items() if src == tf and child in needed]
+            if tf == BASE_TIMEFRAME and self.build_base:
+                self._queue_late_ticks(list(symbols))
+            revised = self._revise_level(list(symbols), tf, children)
+
+            if tf == BASE_TIMEFRAME and not self.build_base:
+                written[tf] = revised
+                continue
+            written[tf] = revised + self._resample_level(list(symbols), tf)
+
+        for key in timeframes:
+            if parse_info_bar(key):
+                written[key] = self._resample_info_level(list(symbols), key)
+
+        return written
+
+    def resample_cascade(self, symbol, timeframes):
+        """
+        resample_batch() for a single symbol.
+        """
+        return self.resample_batch([symbol], timeframes)
@@ -0,0 +1,168 @@
+# resampling/service.py
+
+import threading
+import time
+
+from resampling.sampler import Resampler
+from utils.config import RESAMPLE_INTERVAL, RESAMPLE_MIN_INTERVAL
+
+class ResamplingService:
+    """
+    Background resampler, started alongside ingestion.
+
+    One thread runs Resampler.resample_batch whenever an ingest flush
+    completes (via the ingestor's flush listener) or, failing that, every
+    `interval` seconds. Runs are at least `min_interval` apart so bursts of
+    flushes coalesce. The UI only reads bars and the watermarks exposed here.
+
+    This thread is not the only bar writer: the ingest flush thread upserts
+    1s bars and queues revisions from its StreamingBarBuilder. Both hold
+    connections.write_lock for each write transaction, so writes to ohlc
+    and bar_revisions are serialised. The Resampler aggregates outside the
+    lock and only holds it to copy finished bars in, so a long pass never
+    holds up tick inserts.
+    """
+
+    def __init__(
+        self,
+        datastore,
+        symbols,
+        timeframes,
+        build_base=False,
+        interval=RESAMPLE_INTERVAL,
+        min_interval=RESAMPLE_MIN_INTERVAL
+    ):
+        self.datastore = datastore
+        self.symbols = list(symbols)
+        self.timeframes = list(timeframes)
+        self.interval = interval
+        self.min_interval = min_interval
+
+        self.resampler = Resampler(datastore, build_base=build_base)
+
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+        self._watermarks = {}
+        self._metrics = {"runs": 0, "errors": 0, "last_run_seconds": 0.0, "last_error": None}
+
+    # ---------- Triggers ----------
+
+    def notify(self, *args):
+        """
+        Flush listener: schedules a run. Accepts and ignores the flushed batch.
+        """
+        self._wake.set()
+
+    def attach(self, ingestor):
+        ingestor.add_flush_listener(self.notify)
+        return self
+
+    # ---------- Worker ----------
+
+    def run_once(self):
+        """
+        One resample pass over every symbol and timeframe. Returns
+        {timeframe: bars written}.
+        """
+        start = time.perf_counter()
+        written = self.resampler.resample_batch(self.symbols, self.timeframes)
+        watermarks = self._read_watermarks()
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self._watermarks = watermarks
+            self._metrics["runs"] += 1
+            self._metrics["last_run_seconds"] = elapsed
+
+        return written
+
+    def _read_watermarks(self):
+        rows = self.resampler.con.execute(
+            """
+            SELECT symbol, timeframe, tick_watermark
+            FROM resample_state
+            WHERE list_contains(?, symbol)
+            """,
+            [self.symbols]
+        ).fetchall()
+        watermarks = {(sym, tf): wm for sym, tf, wm in rows}
+
+        # Timeframes written outside the resampler (streamed 1s bars) have
+        # no resample_state; their newest bar start stands in
+        missing = [tf for tf in self.timeframes if all(k[1] != tf for k in watermarks)]
+        if missing:
+            rows = self.resampler.con.execute(
+                """
+                SELECT symbol, timeframe, MAX(ts)
+                FROM ohlc
+                WHERE list_contains(?, symbol) AND list_contains(?, timeframe)
+                GROUP BY symbol, timeframe
+                """,
+                [self.symbols, missing]
+            ).fetchall()
+            watermarks.update({(sym, tf): wm for sym, tf, wm in rows})
+
+        return watermarks
+
+    def _loop(self):
+        while self._running:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if not self._running:
+                break
+
+            started = time.monotonic()
+            try:
+                self.run_once()
+            except Exception as e:
+                print("Resampling error:", e)
+                with self._lock:
+                    self._metrics["errors"] += 1
+                    self._metrics["last_error"] = str(e)
+
+            time.sleep(max(0.0, self.min_interval - (time.monotonic() - started)))
+
+    # ---------- Public API ----------
+
+    def latest_watermark(self, symbol, timeframe):
+        """
+        Newest tick time reflected in `timeframe` bars for `symbol`, or None.
+        """
+        with self._lock:
+            return self._watermarks.get((symbol, timeframe))
+
+    def watermarks(self):
+        with self._lock:
+            return dict(self._watermarks)
+
+    def get_metrics(self):
+        """
+        Run counters and, when the resampler builds 1s bars itself, late
+        ticks revised into bars and those beyond the allowed lateness.
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+        if self.resampler.build_base:
+            metrics["late_ticks"] = self.resampler.late_ticks
+            metrics["too_late_ticks"] = self.resampler.too_late_ticks
+        return metrics
+
+    def start(self):
+        if self._running:
+            return self
+
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        print("Resampling service started.")
+        return self
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        print("Resampling service stopped.")
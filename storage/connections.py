@@ -0,0 +1,76 @@
+# storage/connections.py
+
+import threading
+
+class ConnectionManager:
+    """
+    Hands out DuckDB handles derived from one root connection.
+
+    writer()  the single cursor used for ingest writes; callers serialise
+              access through write_lock
+    cursor()  a cursor owned by the calling thread, for analytics, UI and
+              resampling queries
+
+    Cursors are independent connections to the same database, so readers see
+    committed data without queueing behind tick inserts on the writer.
+
+    Thread cursors are registered against their thread and closed once it
+    has exited (checked whenever a new thread asks for one), so hosts that
+    start a thread per request, such as Streamlit reruns, hold at most one
+    cursor per live thread.
+    """
+
+    def __init__(self, con):
+        self._con = con
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writer = None
+        self._owned = {}
+
+        self.write_lock = threading.Lock()
+
+    def _reap(self):
+        """
+        Closes the cursors of threads that have exited. Called with the lock
+        held.
+        """
+        for thread in [t for t in self._owned if not t.is_alive()]:
+            self._owned.pop(thread).close()
+
+    def _new_cursor(self):
+        with self._lock:
+            self._reap()
+            cur = self._con.cursor()
+            self._owned[threading.current_thread()] = cur
+        return cur
+
+    def writer(self):
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = self._con.cursor()
+        return self._writer
+
+    def cursor(self):
+        cur = getattr(self._local, "cursor", None)
+        if cur is None:
+            cur = self._new_cursor()
+            self._local.cursor = cur
+        return cur
+
+    def open_cursors(self):
+        """
+        Number of thread cursors currently open (the writer excluded).
+        """
+        with self._lock:
+            return len(self._owned)
+
+    def close(self):
+        with self._lock:
+            for cur in self._owned.values():
+                cur.close()
+            if self._writer is not None:
+                self._writer.close()
+            self._owned = {}
+            self._writer = None
+        self._local = threading.local()
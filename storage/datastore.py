@@ -1,25 +1,143 @@
 # storage/datastore.py
 
+import shutil
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
 import duckdb
 import pandas as pd
-from pathlib import Path
+
+from resampling.sampler import TIMEFRAME_MAP, parse_info_bar
+from storage.connections import ConnectionManager
+from utils.config import (
+    COLD_TICK_DIR,
+    FETCH_BATCH_ROWS,
+    HOT_TICK_MAX_AGE_HOURS,
+    RETENTION_BATCH_ROWS,
+    TICK_INSERT_METHOD,
+    TICK_SCHEMA
+)
+
+_TICK_COLUMNS = "ts, symbol, price, size, trade_id, is_buyer_maker"
+
+# get_aligned_closes columns and their value for a symbol without a bar at
+# the row's ts (None: carried over from its previous bar)
+_ALIGNED_FILL = {
+    "open": "b.close",
+    "high": "b.close",
+    "low": "b.close",
+    "close": None,
+    "volume": "0",
+    "vwap": "b.close",
+    "trade_count": "0",
+    "buy_volume": "0",
+    "sell_volume": "0",
+    "is_final": None
+}
+
+# Columns the fetch_* methods may project, per readable relation
+_FETCH_COLUMNS = {
+    "ticks": ("ts", "symbol", "price", "size", "trade_id", "is_buyer_maker"),
+    "ohlc": (
+        "ts", "symbol", "timeframe", "open", "high", "low", "close", "volume",
+        "is_final", "vwap", "trade_count", "buy_volume", "sell_volume"
+    )
+}
 
 class MarketDataStore:
-    def __init__(self, db_path="data/market.duckdb"):
+    """
+    DuckDB-backed store for ticks and bars.
+
+    Ticks are tiered: recent ones live in the ticks_hot table, older whole
+    days are moved by archive_ticks() to Parquet files under cold_dir,
+    partitioned by symbol and date. Readers use the `ticks` view, which spans
+    both tiers; writers go to ticks_hot.
+
+    The hot table has two layouts. standard stores symbol VARCHAR. compact
+    stores symbol_id INTEGER into the `symbols` lookup table; the `ticks` view
+    joins the names back, so readers see the same columns either way. Both
+    keep ts as TIMESTAMP, which DuckDB stores as int64 epoch microseconds: a
+    BIGINT epoch-ms column saves nothing on disk, and decoding it in the view
+    stops ts filters from using zonemaps. Inserts keep arrival order (sorting
+    each flush by symbol costs more in compression than it gains);
+    rewrite_ticks() sorts the whole table by (symbol, ts).
+
+    New databases take the layout from `compact` (default: TICK_SCHEMA);
+    existing ones keep theirs until rewritten by rewrite_ticks() /
+    storage/migrate_ticks.py.
+    """
+
+    def __init__(self, db_path="data/market.duckdb", cold_dir=COLD_TICK_DIR, compact=None):
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.cold_dir = Path(cold_dir).resolve()
+        self.compact = TICK_SCHEMA == "compact" if compact is None else compact
+        self._symbol_ids_cache = {}
         self.con = duckdb.connect(db_path)
+        # Cold-tier footers are read on every scan of the ticks view
+        self.con.execute("SET parquet_metadata_cache = true")
+        # The bar-grid ASOF joins derive their timelines from the data, so the
+        # planner sees a tiny left side and would pick a quadratic loop join
+        self.con.execute("SET GLOBAL asof_loop_join_threshold = 0")
         self._create_tables()
+        self.connections = ConnectionManager(self.con)
+
+    # ---------- CONNECTIONS ----------
+
+    def writer(self):
+        """
+        Cursor reserved for ingest writes. Hold connections.write_lock while
+        using it; the insert methods below already do.
+        """
+        return self.connections.writer()
+
+    def cursor(self):
+        """
+        Cursor owned by the calling thread (UI, analytics, resampling).
+        """
+        return self.connections.cursor()
 
     def _create_tables(self):
+        # Databases created before tiering kept ticks in a plain table
+        if self.con.execute(
+            "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name = 'ticks'"
+        ).fetchone()[0]:
+            self.con.execute("ALTER TABLE ticks RENAME TO ticks_hot")
+
         self.con.execute("""
-            CREATE TABLE IF NOT EXISTS ticks (
+            CREATE TABLE IF NOT EXISTS symbols (
+                symbol_id INTEGER PRIMARY KEY,
+                symbol VARCHAR UNIQUE
+            )
+        """)
+
+        # An existing file keeps its layout, whatever was asked for
+        columns = [
+            row[0] for row in self.con.execute(
+                "SELECT column_name FROM duckdb_columns() WHERE table_name = 'ticks_hot'"
+            ).fetchall()
+        ]
+        if columns:
+            self.compact = "symbol_id" in columns
+
+        self.con.execute(f"""
+            CREATE TABLE IF NOT EXISTS ticks_hot (
                 ts TIMESTAMP,
-                symbol VARCHAR,
+                {"symbol_id INTEGER" if self.compact else "symbol VARCHAR"},
                 price DOUBLE,
-                size DOUBLE
+                size DOUBLE,
+                trade_id BIGINT,
+                is_buyer_maker BOOLEAN
             )
         """)
 
+        # Databases created before ticks kept the trade id and aggressor side
+        self.con.execute("ALTER TABLE ticks_hot ADD COLUMN IF NOT EXISTS trade_id BIGINT")
+        self.con.execute("ALTER TABLE ticks_hot ADD COLUMN IF NOT EXISTS is_buyer_maker BOOLEAN")
+
+        self._create_ticks_view()
+
         self.con.execute("""
             CREATE TABLE IF NOT EXISTS ohlc (
                 ts TIMESTAMP,
@@ -29,26 +147,558 @@ class MarketDataStore:
                 high DOUBLE,
                 low DOUBLE,
                 close DOUBLE,
-                volume DOUBLE
+                volume DOUBLE,
+                is_final BOOLEAN DEFAULT false,
+                vwap DOUBLE,
+                trade_count BIGINT,
+                buy_volume DOUBLE,
+                sell_volume DOUBLE,
+                PRIMARY KEY (symbol, timeframe, ts)
+            )
+        """)
+
+        # Databases created before bars carried a finalized flag and the
+        # order-flow columns
+        self.con.execute("ALTER TABLE ohlc ADD COLUMN IF NOT EXISTS is_final BOOLEAN DEFAULT false")
+        self.con.execute("ALTER TABLE ohlc ADD COLUMN IF NOT EXISTS vwap DOUBLE")
+        self.con.execute("ALTER TABLE ohlc ADD COLUMN IF NOT EXISTS trade_count BIGINT")
+        self.con.execute("ALTER TABLE ohlc ADD COLUMN IF NOT EXISTS buy_volume DOUBLE")
+        self.con.execute("ALTER TABLE ohlc ADD COLUMN IF NOT EXISTS sell_volume DOUBLE")
+
+        self._migrate_ohlc_key()
+
+        # Incremental resampling progress per (symbol, timeframe):
+        # tick_watermark = newest tick aggregated, open_bucket = the only bar
+        # that may still change, carry = measure carried into the open
+        # information bar (tick/volume/dollar bars only)
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS resample_state (
+                symbol VARCHAR,
+                timeframe VARCHAR,
+                tick_watermark TIMESTAMP,
+                open_bucket TIMESTAMP,
+                carry DOUBLE DEFAULT 0,
+                PRIMARY KEY (symbol, timeframe)
+            )
+        """)
+
+        self.con.execute("ALTER TABLE resample_state ADD COLUMN IF NOT EXISTS carry DOUBLE DEFAULT 0")
+
+        # Bars to rebuild because late ticks landed in them after they were
+        # written; consumed by Resampler
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS bar_revisions (
+                symbol VARCHAR,
+                timeframe VARCHAR,
+                ts TIMESTAMP
+            )
+        """)
+
+    def _migrate_ohlc_key(self):
+        """
+        One-time migration for databases whose ohlc table predates the
+        (symbol, timeframe, ts) primary key: drops duplicate bars, keeping a
+        finalized one where there is a choice, then adds the key.
+        """
+        has_key = self.con.execute(
+            """
+            SELECT COUNT(*)
+            FROM duckdb_constraints()
+            WHERE table_name = 'ohlc' AND constraint_type = 'PRIMARY KEY'
+            """
+        ).fetchone()[0]
+        if has_key:
+            return
+
+        # Two steps: the key cannot be added in the transaction that removed
+        # the duplicates. Re-running after a failure is harmless.
+        removed = self.con.execute(
+            """
+            DELETE FROM ohlc
+            WHERE rowid IN (
+                SELECT rowid
+                FROM ohlc
+                QUALIFY row_number() OVER (
+                    PARTITION BY symbol, timeframe, ts
+                    ORDER BY is_final DESC, rowid DESC
+                ) > 1
             )
+            """
+        ).fetchone()[0]
+        self.con.execute("ALTER TABLE ohlc ADD PRIMARY KEY (symbol, timeframe, ts)")
+
+        print(f"Migrated ohlc to a (symbol, timeframe, ts) key, removed {removed} duplicate bars.")
+
+    @property
+    def _hot_ticks(self):
+        """
+        SELECT over the hot table with the standard tick columns.
+        """
+        if not self.compact:
+            return f"SELECT {_TICK_COLUMNS} FROM ticks_hot"
+
+        return """
+            SELECT
+                h.ts,
+                s.symbol,
+                h.price,
+                h.size,
+                h.trade_id,
+                h.is_buyer_maker
+            FROM ticks_hot h
+            JOIN symbols s USING (symbol_id)
+        """
+
+    def _symbol_ids(self, symbols):
+        """
+        Returns the symbols-table id of each name, registering new ones.
+        """
+        missing = [sym for sym in symbols if sym not in self._symbol_ids_cache]
+        if missing:
+            with self.connections.write_lock:
+                con = self.writer()
+                con.execute(
+                    """
+                    INSERT INTO symbols
+                    SELECT
+                        (SELECT coalesce(max(symbol_id), -1) FROM symbols) + row_number() OVER (),
+                        name
+                    FROM (SELECT DISTINCT unnest(?::VARCHAR[]) AS name)
+                    WHERE name NOT IN (SELECT symbol FROM symbols)
+                    """,
+                    [missing]
+                )
+                self._symbol_ids_cache.update(con.execute(
+                    "SELECT symbol, symbol_id FROM symbols WHERE list_contains(?, symbol)",
+                    [missing]
+                ).fetchall())
+
+        return [self._symbol_ids_cache[sym] for sym in symbols]
+
+    def _insert_named_ticks(self, view, data):
+        """
+        Inserts a batch with the standard tick columns (ts, symbol, ...; any
+        nullable ones may be omitted) into the compact hot table.
+        """
+        with self.connections.write_lock:
+            con = self.writer()
+            con.register(view, data)
+            try:
+                con.execute(
+                    f"""
+                    INSERT INTO symbols
+                    SELECT
+                        (SELECT coalesce(max(symbol_id), -1) FROM symbols) + row_number() OVER (),
+                        name
+                    FROM (SELECT DISTINCT symbol::VARCHAR AS name FROM {view})
+                    WHERE name NOT IN (SELECT symbol FROM symbols)
+                    """
+                )
+                con.execute(
+                    f"""
+                    INSERT INTO ticks_hot BY NAME
+                    SELECT
+                        b.* EXCLUDE (symbol),
+                        s.symbol_id
+                    FROM {view} b
+                    JOIN symbols s ON s.symbol = b.symbol::VARCHAR
+                    """
+                )
+            finally:
+                con.unregister(view)
+
+    def _create_ticks_view(self, con=None):
+        """
+        (Re)creates the `ticks` view over both tiers. read_parquet fails on a
+        glob without matches, so the cold branch is only added once the cold
+        tier has files; archive_ticks() calls this after writing.
+        """
+        cold = ""
+        if any(self.cold_dir.glob("symbol=*/date=*/*.parquet")):
+            cold = f"""
+                UNION ALL
+                SELECT {_TICK_COLUMNS}
+                FROM read_parquet(
+                    '{self.cold_dir.as_posix()}/symbol=*/date=*/*.parquet',
+                    hive_partitioning = true,
+                    hive_types = {{'symbol': VARCHAR, 'date': DATE}},
+                    union_by_name = true
+                )
+            """
+
+        (con or self.con).execute(f"""
+            CREATE OR REPLACE VIEW ticks AS
+            {self._hot_ticks}
+            {cold}
         """)
 
     # ---------- INSERT METHODS ----------
 
+    def _scan_insert(self, view, data, query, params=None):
+        """
+        Registers `data` (DataFrame, Arrow table or dict of NumPy arrays) as a
+        view on the writer, runs `query` against it and drops the view again.
+        DuckDB scans Arrow and NumPy buffers in place.
+        """
+        with self.connections.write_lock:
+            con = self.writer()
+            con.register(view, data)
+            try:
+                con.execute(query, params)
+            finally:
+                con.unregister(view)
+
+    def bulk_insert(self, table, data):
+        """
+        Appends an Arrow table / record batch or a dict of NumPy arrays to
+        `table`. Columns are matched by name, so the batch may list them in any
+        order and omit nullable ones.
+        """
+        if table not in ("ticks", "ohlc"):
+            raise ValueError(f"Unknown table: {table}")
+
+        # Ticks are always written to the hot tier
+        if table == "ticks" and self.compact:
+            self._insert_named_ticks("ticks_batch", data)
+            return
+
+        target = "ticks_hot" if table == "ticks" else table
+        self._scan_insert(
+            f"{table}_batch",
+            data,
+            f"INSERT INTO {target} BY NAME SELECT * FROM {table}_batch"
+        )
+
     def insert_ticks(self, df: pd.DataFrame):
         """
-        Expects columns: ts, symbol, price, size
+        Expects columns: ts, symbol, price, size[, trade_id, is_buyer_maker]
+        """
+        if self.compact:
+            self._insert_named_ticks("ticks_df", df)
+            return
+
+        self._scan_insert("ticks_df", df, "INSERT INTO ticks_hot BY NAME SELECT * FROM ticks_df")
+
+    def insert_tick_columns(self, columns, symbols, method=TICK_INSERT_METHOD):
+        """
+        Columnar insert of a drained tick buffer.
+        Expects columns: ts (int64 epoch ms), symbol_id (index into symbols),
+        price, size, trade_id, is_buyer_maker
+
+        method:
+            numpy   scan the NumPy arrays directly, convert inside the INSERT
+            arrow   wrap the arrays as an Arrow table (zero-copy) and bulk_insert
+            append  build a DataFrame and use the DuckDB appender
+
+        A compact store always takes the numpy path: codes are remapped to
+        symbol ids inside the INSERT.
         """
-        self.con.register("ticks_df", df)
-        self.con.execute("INSERT INTO ticks SELECT * FROM ticks_df")
+        if self.compact:
+            self._scan_insert(
+                "tick_columns",
+                columns,
+                """
+                INSERT INTO ticks_hot (ts, symbol_id, price, size, trade_id, is_buyer_maker)
+                SELECT
+                    epoch_ms(ts),
+                    list_extract(?, symbol_id + 1),
+                    price,
+                    size,
+                    trade_id,
+                    is_buyer_maker
+                FROM tick_columns
+                """,
+                [self._symbol_ids(symbols)]
+            )
+
+        elif method == "numpy":
+            self._scan_insert(
+                "tick_columns",
+                columns,
+                """
+                INSERT INTO ticks_hot (ts, symbol, price, size, trade_id, is_buyer_maker)
+                SELECT
+                    epoch_ms(ts),
+                    list_extract(?, symbol_id + 1),
+                    price,
+                    size,
+                    trade_id,
+                    is_buyer_maker
+                FROM tick_columns
+                """,
+                [symbols]
+            )
+
+        elif method == "arrow":
+            import pyarrow as pa
+
+            table = pa.table({
+                "ts": pa.array(columns["ts"].view("datetime64[ms]")),
+                "symbol": pa.DictionaryArray.from_arrays(
+                    pa.array(columns["symbol_id"]), pa.array(symbols)
+                ),
+                "price": columns["price"],
+                "size": columns["size"],
+                "trade_id": columns["trade_id"],
+                "is_buyer_maker": columns["is_buyer_maker"]
+            })
+            self.bulk_insert("ticks", table)
+
+        elif method == "append":
+            df = pd.DataFrame({
+                "ts": columns["ts"].view("datetime64[ms]"),
+                "symbol": pd.Categorical.from_codes(columns["symbol_id"], symbols),
+                "price": columns["price"],
+                "size": columns["size"],
+                "trade_id": columns["trade_id"],
+                "is_buyer_maker": columns["is_buyer_maker"]
+            })
+            with self.connections.write_lock:
+                self.writer().append("ticks_hot", df, by_name=True)
+
+        else:
+            raise ValueError(f"Unknown insert method: {method}")
 
     def insert_ohlc(self, df: pd.DataFrame):
         """
         Expects columns:
-        ts, symbol, timeframe, open, high, low, close, volume
+        ts, symbol, timeframe, open, high, low, close, volume[, is_final,
+        vwap, trade_count, buy_volume, sell_volume]
+
+        Raises on a bar whose (symbol, timeframe, ts) already exists; use
+        upsert_ohlc() to overwrite.
+        """
+        self._scan_insert("ohlc_df", df, "INSERT INTO ohlc BY NAME SELECT * FROM ohlc_df")
+
+    def bulk_upsert(self, table, data):
+        """
+        bulk_insert() with insert-or-replace on the table's primary key
+        (ohlc: symbol, timeframe, ts; resample_state: symbol, timeframe).
+        Columns left out keep their stored value on replaced rows. Keys must
+        be unique within one batch.
+        """
+        if table not in ("ohlc", "resample_state"):
+            raise ValueError(f"No primary key to upsert on: {table}")
+
+        self._scan_insert(
+            f"{table}_batch",
+            data,
+            f"INSERT OR REPLACE INTO {table} BY NAME SELECT * FROM {table}_batch"
+        )
+
+    def upsert_ohlc(self, df: pd.DataFrame):
+        """
+        insert_ohlc() that overwrites bars whose (symbol, timeframe, ts)
+        already exists.
+        """
+        self.bulk_upsert("ohlc", df)
+
+    def insert_revisions(self, timeframe, revisions):
+        """
+        Queues [(symbol, ts)] bars of `timeframe` for the Resampler to rebuild.
+        """
+        if not revisions:
+            return
+
+        df = pd.DataFrame(revisions, columns=["symbol", "ts"])
+        df["timeframe"] = timeframe
+        self._scan_insert(
+            "revisions_df",
+            df,
+            "INSERT INTO bar_revisions BY NAME SELECT * FROM revisions_df"
+        )
+
+    # ---------- TIERING ----------
+
+    def archive_ticks(self, max_age_hours=HOT_TICK_MAX_AGE_HOURS, now=None):
         """
-        self.con.register("ohlc_df", df)
-        self.con.execute("INSERT INTO ohlc SELECT * FROM ohlc_df")
+        Moves every whole UTC day of ticks older than `max_age_hours` from
+        ticks_hot to Parquet under cold_dir/symbol=<s>/date=<d>/, sorted by
+        ts, and deletes them from the hot table. Returns the rows moved.
+
+        Runs on its own cursor: the copy and the delete share one snapshot,
+        and ingest writes are never blocked. Ticks that arrive late for an
+        archived day are moved by a later call, as an extra file in the same
+        partition.
+
+        Files are written to a staging directory under cold_dir that the
+        ticks view does not read, and moved into the partition tree only
+        once the delete has committed; on rollback they are removed, so no
+        row is ever served from both tiers.
+        """
+        now = now or datetime.fromtimestamp(time.time(), timezone.utc).replace(tzinfo=None)
+        cutoff = datetime.combine((now - timedelta(hours=max_age_hours)).date(), datetime.min.time())
+
+        con = self.cursor()
+        staging = self.cold_dir / "_staging" / uuid.uuid4().hex
+        con.begin()
+        try:
+            moved = con.execute(
+                "SELECT COUNT(*) FROM ticks_hot WHERE ts < ?", [cutoff]
+            ).fetchone()[0]
+            if not moved:
+                con.rollback()
+                return 0
+
+            staging.mkdir(parents=True)
+            con.execute(
+                f"""
+                COPY (
+                    SELECT {_TICK_COLUMNS}, CAST(ts AS DATE) AS date
+                    FROM ({self._hot_ticks})
+                    WHERE ts < ?
+                    ORDER BY symbol, ts
+                ) TO '{staging.as_posix()}' (
+                    FORMAT parquet,
+                    PARTITION_BY (symbol, date),
+                    FILENAME_PATTERN 'ticks_{{uuid}}'
+                )
+                """,
+                [cutoff]
+            )
+            con.execute("DELETE FROM ticks_hot WHERE ts < ?", [cutoff])
+            con.commit()
+        except Exception:
+            con.rollback()
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        for path in staging.glob("symbol=*/date=*/*.parquet"):
+            target = self.cold_dir / path.relative_to(staging)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            path.replace(target)
+        shutil.rmtree(staging, ignore_errors=True)
+
+        self._create_ticks_view(con)
+        return moved
+
+    def rewrite_ticks(self, compact=None):
+        """
+        Rewrites the hot table in one transaction, in the standard or compact
+        layout (default: the current one) and physically sorted by
+        (symbol, ts), then checkpoints. Returns the rows rewritten.
+        Ingest should be stopped; concurrent inserts would conflict.
+        """
+        compact = self.compact if compact is None else compact
+        hot = self._hot_ticks
+        con = self.cursor()
+
+        con.begin()
+        try:
+            if compact:
+                con.execute(
+                    f"""
+                    INSERT INTO symbols
+                    SELECT
+                        (SELECT coalesce(max(symbol_id), -1) FROM symbols) + row_number() OVER (),
+                        name
+                    FROM (SELECT DISTINCT symbol AS name FROM ({hot}))
+                    WHERE name NOT IN (SELECT symbol FROM symbols)
+                    """
+                )
+                select = f"""
+                    SELECT
+                        t.ts,
+                        s.symbol_id,
+                        t.price,
+                        t.size,
+                        t.trade_id,
+                        t.is_buyer_maker
+                    FROM ({hot}) t
+                    JOIN symbols s USING (symbol)
+                    ORDER BY s.symbol_id, t.ts
+                """
+            else:
+                select = f"SELECT {_TICK_COLUMNS} FROM ({hot}) ORDER BY symbol, ts"
+
+            rows = con.execute(f"CREATE TABLE ticks_rewrite AS {select}").fetchone()[0]
+            con.execute("DROP VIEW ticks")
+            con.execute("DROP TABLE ticks_hot")
+            con.execute("ALTER TABLE ticks_rewrite RENAME TO ticks_hot")
+
+            self.compact = compact
+            self._create_ticks_view(con)
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+
+        self._symbol_ids_cache = {}
+        self.checkpoint()
+        return rows
+
+    # ---------- RETENTION ----------
+
+    def delete_older_than(self, table, cutoff, timeframe=None, batch_rows=RETENTION_BATCH_ROWS):
+        """
+        Deletes rows with ts < cutoff from ticks_hot or ohlc (one timeframe,
+        or all when None), at most `batch_rows` per transaction so concurrent
+        writers never wait on one large delete. Each batch holds write_lock,
+        like the ingest and resampler writes. Returns the rows deleted.
+        """
+        if table == "ticks":
+            table = "ticks_hot"
+        if table not in ("ticks_hot", "ohlc"):
+            raise ValueError(f"Unknown table: {table}")
+
+        where = "ts < ?"
+        params = [cutoff]
+        if timeframe is not None:
+            where += " AND timeframe = ?"
+            params.append(timeframe)
+
+        con = self.cursor()
+        deleted = 0
+        while True:
+            with self.connections.write_lock:
+                n = con.execute(
+                    f"""
+                    DELETE FROM {table}
+                    WHERE rowid IN (
+                        SELECT rowid FROM {table} WHERE {where} LIMIT ?
+                    )
+                    """,
+                    params + [batch_rows]
+                ).fetchone()[0]
+            deleted += n
+            if n < batch_rows:
+                return deleted
+
+    def drop_cold_ticks(self, cutoff):
+        """
+        Removes cold-tier partitions for days entirely before `cutoff`.
+        Whole files are unlinked; nothing is rewritten. Returns the number
+        of partitions removed.
+        """
+        removed = 0
+        for partition in self.cold_dir.glob("symbol=*/date=*"):
+            day = datetime.strptime(partition.name.split("=", 1)[1], "%Y-%m-%d")
+            if day + timedelta(days=1) <= cutoff:
+                shutil.rmtree(partition)
+                removed += 1
+
+        if removed:
+            self._create_ticks_view(self.cursor())
+        return removed
+
+    def checkpoint(self, retries=3, retry_delay=1.0):
+        """
+        Flushes the WAL and lets DuckDB reclaim space freed by deletes.
+
+        CHECKPOINT fails while another write transaction is open, so it runs
+        under write_lock, which every ingest and resampler write holds. A
+        writer outside the lock (e.g. a one-off script) is waited out with up
+        to `retries` attempts before the conflict is raised.
+        """
+        for attempt in range(retries):
+            with self.connections.write_lock:
+                try:
+                    self.cursor().execute("CHECKPOINT")
+                    return
+                except duckdb.TransactionException:
+                    if attempt == retries - 1:
+                        raise
+            time.sleep(retry_delay)
 
     # ---------- QUERY METHODS ----------
 
@@ -57,12 +707,17 @@ class MarketDataStore:
     def get_ticks(self, symbol, limit=100):
         query = """
             SELECT *
-            FROM ticks
+            FROM {table}
             WHERE symbol = ?
             ORDER BY ts DESC
             LIMIT ?
         """
-        return self.con.execute(query, [symbol, limit]).fetchdf()
+        # The newest ticks are nearly always hot; only fall back to the
+        # tiered view when the hot table cannot fill the request
+        df = self.cursor().execute(query.format(table=f"({self._hot_ticks})"), [symbol, limit]).fetchdf()
+        if len(df) < limit:
+            df = self.cursor().execute(query.format(table="ticks"), [symbol, limit]).fetchdf()
+        return df
 
 
     def get_ohlc(self, symbol, timeframe, lookback_minutes=60):
@@ -74,4 +729,209 @@ class MarketDataStore:
             AND ts >= NOW() - INTERVAL {lookback_minutes} MINUTE
             ORDER BY ts
         """
-        return self.con.execute(query).fetchdf()
+        return self.cursor().execute(query).fetchdf()
+
+    # ---------- COLUMNAR FETCH ----------
+
+    def _range_query(self, table, columns, symbols, timeframe, start, end):
+        """
+        SELECT for the fetch methods: projected columns of `ticks` or `ohlc`,
+        filtered by symbol(s), timeframe and [start, end), ordered by ts.
+        """
+        allowed = _FETCH_COLUMNS.get(table)
+        if allowed is None:
+            raise ValueError(f"Unknown table: {table}")
+
+        columns = list(allowed if columns is None else columns)
+        unknown = [c for c in columns if c not in allowed]
+        if unknown:
+            raise ValueError(f"Unknown columns for {table}: {unknown}")
+
+        where, params = [], []
+        if symbols is not None:
+            if isinstance(symbols, str):
+                symbols = [symbols]
+            where.append("list_contains(?, symbol)")
+            params.append(list(symbols))
+        if timeframe is not None:
+            if table != "ohlc":
+                raise ValueError("timeframe applies to ohlc only")
+            where.append("timeframe = ?")
+            params.append(timeframe)
+        if start is not None:
+            where.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("ts < ?")
+            params.append(end)
+
+        query = f"""
+            SELECT {", ".join(columns)}
+            FROM {table}
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY ts, symbol
+        """
+        return query, params
+
+    def fetch_arrow(self, table, columns=None, symbols=None, timeframe=None, start=None, end=None):
+        """
+        Selected columns of `ticks` or `ohlc` as a pyarrow.Table, handed over
+        from DuckDB's result buffers without building a DataFrame.
+        """
+        query, params = self._range_query(table, columns, symbols, timeframe, start, end)
+        return self.cursor().execute(query, params).to_arrow_table()
+
+    def fetch_numpy(self, table, columns=None, symbols=None, timeframe=None, start=None, end=None):
+        """
+        Selected columns as {name: NumPy array}; ts is datetime64[us].
+        Columns holding NULLs come back as masked arrays.
+        """
+        query, params = self._range_query(table, columns, symbols, timeframe, start, end)
+        return self.cursor().execute(query, params).fetchnumpy()
+
+    def iter_batches(
+        self,
+        table,
+        columns=None,
+        symbols=None,
+        timeframe=None,
+        start=None,
+        end=None,
+        batch_rows=FETCH_BATCH_ROWS
+    ):
+        """
+        Streams the same result as fetch_arrow in pyarrow.RecordBatch chunks
+        of at most batch_rows, so a long range is never held in memory whole.
+
+        Runs on its own cursor: the thread's cursor stays free for other
+        queries while the iterator is open.
+        """
+        query, params = self._range_query(table, columns, symbols, timeframe, start, end)
+        con = self.con.cursor()
+        try:
+            yield from con.execute(query, params).to_arrow_reader(batch_rows)
+        finally:
+            con.close()
+
+    def get_aligned_closes(
+        self,
+        symbols,
+        timeframe,
+        start=None,
+        end=None,
+        columns=("close",),
+        lookback=None
+    ):
+        """
+        Wide, time-aligned bars for several symbols from one query: ts plus
+        one `<column>_<symbol>` column per requested column and symbol.
+
+        Time bars are laid on the bucket grid of `timeframe`; tick, volume and
+        dollar bars on the union of the symbols' bar timestamps. Each row takes
+        every symbol's latest bar at or before ts (which may lie before
+        start). close and is_final carry over from that bar; for a symbol
+        without a bar at ts, open/high/low/vwap equal its close and
+        volume/trade_count/buy_volume/sell_volume are 0. Rows before every
+        symbol has a bar are dropped.
+
+        end defaults to the newest bar of any symbol; start to end - lookback
+        (a timedelta) when given, else to the first ts where every symbol has
+        a bar.
+        """
+        symbols = list(symbols)
+        columns = list(columns)
+        unknown = [c for c in columns if c not in _ALIGNED_FILL]
+        if unknown:
+            raise ValueError(f"Unknown columns for ohlc: {unknown}")
+
+        if timeframe in TIMEFRAME_MAP:
+            interval = TIMEFRAME_MAP[timeframe]
+            timeline = f"""
+                SELECT unnest(generate_series(
+                    time_bucket(INTERVAL '{interval}', start_ts),
+                    end_ts,
+                    INTERVAL '{interval}'
+                )) AS ts
+                FROM bounds
+            """
+        elif parse_info_bar(timeframe) is not None:
+            timeline = """
+                SELECT DISTINCT b.ts
+                FROM bars b, bounds
+                WHERE b.ts BETWEEN start_ts AND end_ts
+            """
+        else:
+            raise ValueError(f"Unknown timeframe: {timeframe}")
+
+        # One ASOF join over (ts, symbol), pivoted to a column per symbol
+        select = []
+        for i, symbol in enumerate(symbols):
+            for column in columns:
+                fill = _ALIGNED_FILL[column]
+                value = f"b.{column}" if fill is None else f"CASE WHEN b.ts = g.ts THEN b.{column} ELSE {fill} END"
+                select.append(
+                    f'first({value}) FILTER (WHERE g.symbol = $symbols[{i + 1}]) AS "{column}_{symbol}"'
+                )
+
+        query = f"""
+            WITH spans AS (
+                SELECT MIN(ts) AS first_ts, MAX(ts) AS last_ts
+                FROM ohlc
+                WHERE timeframe = $timeframe
+                AND list_contains($symbols, symbol)
+                AND ts <= coalesce($end::TIMESTAMP, 'infinity'::TIMESTAMP)
+                GROUP BY symbol
+            ),
+            bounds AS (
+                SELECT
+                    coalesce($start::TIMESTAMP, coalesce($end::TIMESTAMP, MAX(last_ts)) - $lookback::INTERVAL, MAX(first_ts)) AS start_ts,
+                    coalesce($end::TIMESTAMP, MAX(last_ts)) AS end_ts
+                FROM spans
+            ),
+            seeds AS (
+                -- Oldest of the symbols' last bars at or before start, so the
+                -- first rows can carry them forward
+                SELECT coalesce(MIN(ts), ANY_VALUE(start_ts)) AS from_ts
+                FROM bounds
+                LEFT JOIN (
+                    SELECT MAX(ts) AS ts
+                    FROM ohlc, bounds
+                    WHERE timeframe = $timeframe
+                    AND list_contains($symbols, symbol)
+                    AND ts <= start_ts
+                    GROUP BY symbol
+                ) ON true
+            ),
+            bars AS (
+                SELECT o.ts, o.symbol, {", ".join(f"o.{c}" for c in columns)}
+                FROM ohlc o, bounds, seeds
+                WHERE o.timeframe = $timeframe
+                AND list_contains($symbols, o.symbol)
+                AND o.ts BETWEEN from_ts AND end_ts
+            ),
+            timeline AS ({timeline}),
+            grid AS (
+                SELECT t.ts, s.symbol
+                FROM timeline t
+                CROSS JOIN (SELECT unnest($symbols) AS symbol) s
+            )
+            SELECT
+                g.ts,
+                {", ".join(select)}
+            FROM grid g
+            ASOF LEFT JOIN bars b
+                ON g.symbol = b.symbol AND g.ts >= b.ts
+            GROUP BY g.ts
+            HAVING COUNT(b.ts) = len($symbols)
+            ORDER BY g.ts
+        """
+        return self.cursor().execute(
+            query,
+            {
+                "symbols": symbols,
+                "timeframe": timeframe,
+                "start": start,
+                "end": end,
+                "lookback": lookback
+            }
+        ).fetchdf()
@@ -0,0 +1,140 @@
+# storage/maintenance.py
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from utils.config import (
+    HOT_TICK_MAX_AGE_HOURS,
+    MAINTENANCE_INTERVAL,
+    RETENTION_BATCH_ROWS,
+    RETENTION_DAYS
+)
+
+class MaintenanceJob:
+    """
+    Background housekeeping for a MarketDataStore.
+
+    On start and then every `interval` seconds: moves aged ticks to the cold
+    tier, enforces the retention rules, then checkpoints so space freed by
+    the deletes is reused and the file stops growing.
+
+    rules maps (table, timeframe) to days kept, e.g.
+    {("ticks", None): 7, ("ohlc", "1s"): 30, ("ohlc", "1m"): 365}.
+    Tick rules cover both tiers: cold partitions are dropped as whole days,
+    hot rows deleted in batches of `batch_rows`. Only the rows named by a
+    rule are ever deleted; deleting old bars never touches the open buckets
+    the resampler writes.
+    """
+
+    def __init__(
+        self,
+        datastore,
+        rules=RETENTION_DAYS,
+        interval=MAINTENANCE_INTERVAL,
+        batch_rows=RETENTION_BATCH_ROWS,
+        hot_tick_hours=HOT_TICK_MAX_AGE_HOURS
+    ):
+        self.datastore = datastore
+        self.rules = dict(rules)
+        self.interval = interval
+        self.batch_rows = batch_rows
+        self.hot_tick_hours = hot_tick_hours
+
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self._metrics = {
+            "runs": 0,
+            "errors": 0,
+            "last_error": None,
+            "archived_ticks": 0,
+            "cold_partitions_dropped": 0,
+            "deleted": {},
+            "last_run_seconds": 0.0,
+            "last_checkpoint_seconds": 0.0
+        }
+
+    # ---------- Worker ----------
+
+    def run_once(self, now=None):
+        """
+        One maintenance pass. Returns {(table, timeframe): rows deleted} for
+        the hot database; dropped cold partitions are counted in the metrics.
+        """
+        now = now or datetime.fromtimestamp(time.time(), timezone.utc).replace(tzinfo=None)
+        store = self.datastore
+        start = time.perf_counter()
+
+        archived = 0
+        if self.hot_tick_hours is not None:
+            archived = store.archive_ticks(self.hot_tick_hours, now=now)
+
+        deleted = {}
+        partitions = 0
+        for (table, timeframe), days in self.rules.items():
+            cutoff = now - timedelta(days=days)
+            deleted[(table, timeframe)] = store.delete_older_than(table, cutoff, timeframe, self.batch_rows)
+            if table == "ticks":
+                partitions += store.drop_cold_ticks(cutoff)
+
+        # Recorded before the checkpoint: the work above is committed even
+        # if the checkpoint fails
+        with self._lock:
+            m = self._metrics
+            m["archived_ticks"] += archived
+            m["cold_partitions_dropped"] += partitions
+            for key, n in deleted.items():
+                m["deleted"][key] = m["deleted"].get(key, 0) + n
+
+        checkpoint_start = time.perf_counter()
+        store.checkpoint()
+        end = time.perf_counter()
+
+        with self._lock:
+            m = self._metrics
+            m["runs"] += 1
+            m["last_run_seconds"] = end - start
+            m["last_checkpoint_seconds"] = end - checkpoint_start
+
+        return deleted
+
+    def _loop(self):
+        # First pass at startup, so a long-stopped store is trimmed at once
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                print("Maintenance error:", e)
+                with self._lock:
+                    self._metrics["errors"] += 1
+                    self._metrics["last_error"] = str(e)
+
+            if self._stop.wait(self.interval):
+                break
+
+    # ---------- Public API ----------
+
+    def get_metrics(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["deleted"] = dict(metrics["deleted"])
+        return metrics
+
+    def start(self):
+        if self._thread is not None:
+            return self
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        print("Maintenance job started.")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        print("Maintenance job stopped.")
@@ -0,0 +1,57 @@
+# storage/migrate_ticks.py
+#
+# Rewrites the hot ticks table of an existing database in the standard or
+# compact layout, physically sorted by (symbol, ts), then copies the database
+# into a fresh file: DuckDB reuses freed blocks but never shrinks a file, so
+# the copy is what returns the space. Stop ingestion first.
+#
+#   python -m storage.migrate_ticks data/market.duckdb --to compact
+
+import argparse
+import os
+
+import duckdb
+
+from storage.datastore import MarketDataStore
+
+
+def vacuum_copy(db_path):
+    """
+    Replaces db_path with a fresh copy of its contents.
+    """
+    tmp = db_path + ".migrating"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+
+    con = duckdb.connect()
+    con.execute(f"ATTACH '{db_path}' AS src (READ_ONLY)")
+    con.execute(f"ATTACH '{tmp}' AS dst")
+    con.execute("COPY FROM DATABASE src TO dst")
+    con.close()
+
+    os.replace(tmp, db_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite the ticks table layout")
+    parser.add_argument("db_path")
+    parser.add_argument("--to", choices=("standard", "compact"), default="compact")
+    args = parser.parse_args()
+
+    before = os.path.getsize(args.db_path)
+    store = MarketDataStore(args.db_path)
+    layout = "compact" if store.compact else "standard"
+
+    rows = store.rewrite_ticks(compact=args.to == "compact")
+    store.connections.close()
+    store.con.close()
+
+    vacuum_copy(args.db_path)
+    after = os.path.getsize(args.db_path)
+
+    print(f"ticks_hot: {layout} -> {args.to}, {rows} rows, sorted by (symbol, ts)")
+    print(f"file size: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
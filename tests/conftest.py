@@ -0,0 +1,26 @@
+# tests/conftest.py
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Modules are imported from the repository root, as the app and benchmarks do
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from storage.datastore import MarketDataStore  # noqa: E402
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    """
+    Factory for MarketDataStores in tmp_path; `name` keeps several apart.
+    """
+    def make(name="m"):
+        return MarketDataStore(str(tmp_path / f"{name}.duckdb"), cold_dir=str(tmp_path / f"{name}_cold"))
+    return make
+
+
+@pytest.fixture
+def store(make_store):
+    return make_store()
@@ -0,0 +1,89 @@
+# tests/test_async_overflow.py
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import ingestion.binance_async as binance_async
+from ingestion.binance_async import AsyncBinanceIngestor
+from ingestion.flush_policy import FlushPolicy
+
+
+def trade(i, symbol="BTCUSDT"):
+    return json.dumps({
+        "e": "trade", "s": symbol, "T": 1_700_000_000_000 + i,
+        "p": "100.0", "q": "1.0", "t": i, "m": False
+    })
+
+
+class FakeSocket:
+    """
+    Stands in for a websockets connection: yields the given frames once, then
+    stops the ingestor so _consume returns instead of reconnecting.
+    """
+
+    close_code = 1000
+    close_reason = ""
+
+    def __init__(self, ingestor, messages):
+        self.ingestor = ingestor
+        self.messages = messages
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def __aiter__(self):
+        for message in self.messages:
+            yield message
+        self.ingestor._running = False
+
+
+@pytest.mark.parametrize("overflow", ["block", "drop_oldest", "spill"])
+def test_consume_survives_full_buffer(tmp_path, store, monkeypatch, overflow):
+    policy = FlushPolicy(
+        max_rows=50,
+        max_age=60,
+        max_buffer_rows=50,
+        overflow=overflow,
+        spill_dir=str(tmp_path / "spill")
+    )
+    ingestor = AsyncBinanceIngestor(["btcusdt"], store, flush_policy=policy, reconnect_delay=0)
+
+    errors = []
+    ingestor._on_error = lambda ws, error: errors.append(error)
+    # The buffer is already at its bound when the socket delivers, as when
+    # another connection filled it while a flush was still running
+    for i in range(50):
+        ingestor._buffer.append(1_700_000_000_000 + i, "BTCUSDT", 100.0, 1.0, i, False)
+    messages = [trade(i) for i in range(50, 200)]
+    monkeypatch.setattr(
+        binance_async.websockets,
+        "connect",
+        lambda url, **kwargs: FakeSocket(ingestor, messages)
+    )
+
+    ingestor._running = True
+    ingestor._executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        # A failing message drops the socket and _consume reconnects forever
+        asyncio.run(asyncio.wait_for(ingestor._consume(["btcusdt"]), 10))
+        ingestor._flush_buffer()
+    finally:
+        ingestor._executor.shutdown()
+
+    assert errors == []
+    assert ingestor._buffer.rows == 0
+
+    stored = store.cursor().execute("SELECT COUNT(*), MAX(trade_id) FROM ticks").fetchone()
+    metrics = ingestor.get_metrics()
+    assert stored[1] == 199
+    if overflow == "drop_oldest":
+        assert metrics["dropped"] > 0
+        assert stored[0] + metrics["dropped"] == 200
+    else:
+        assert stored[0] == 200
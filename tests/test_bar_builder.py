@@ -0,0 +1,90 @@
+# tests/test_bar_builder.py
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from ingestion.binance_ws import BinanceWebSocketIngestor
+from resampling.bar_builder import StreamingBarBuilder
+from resampling.sampler import Resampler
+
+START_MS = 1_704_067_200_000
+
+
+def trade(ts, trade_id):
+    return json.dumps({
+        "e": "trade", "s": "A", "T": ts,
+        "p": str(100.0 + trade_id), "q": "1.0", "t": trade_id, "m": False
+    })
+
+
+def run_session(store, stamps, first_id):
+    ingestor = BinanceWebSocketIngestor(["a"], store, bar_builder=StreamingBarBuilder())
+    for i, ts in enumerate(stamps):
+        ingestor._on_message(None, trade(START_MS + ts, first_id + i))
+    ingestor.stop()
+
+
+def bar_counts(store):
+    return dict(store.cursor().execute(
+        "SELECT ts, trade_count FROM ohlc WHERE timeframe = '1s' ORDER BY ts"
+    ).fetchall())
+
+
+def test_restart_mid_bucket_rebuilds_the_split_bar(store):
+    # Stop while the bar at +1 s is still open, restart inside that bucket
+    run_session(store, [0, 200, 400, 1_000, 1_100], 0)
+    assert bar_counts(store)[pd.Timestamp(START_MS + 1_000, unit="ms")] == 2
+
+    run_session(store, [1_500, 1_600, 2_000], 5)
+    Resampler(store, build_base=False).resample_batch(["a"], ["1s"])
+
+    counts = bar_counts(store)
+    assert counts == {
+        pd.Timestamp(START_MS, unit="ms"): 3,
+        pd.Timestamp(START_MS + 1_000, unit="ms"): 4,
+        pd.Timestamp(START_MS + 2_000, unit="ms"): 1
+    }
+    close = store.cursor().execute(
+        "SELECT close FROM ohlc WHERE timeframe = '1s' AND ts = ?",
+        [pd.Timestamp(START_MS + 1_000, unit="ms")]
+    ).fetchone()[0]
+    assert close == 106.0
+
+
+def test_streamed_bars_match_resampled_bars_on_tied_timestamps(store):
+    rng = np.random.default_rng(0)
+    n = 20_000
+    # Around four trades per millisecond, arriving in random order within
+    # each millisecond, so open and close hinge on the trade_id tie-break
+    ts = START_MS + np.sort(rng.integers(0, 5_000, n)).astype(np.int64)
+    arrival = np.lexsort((rng.random(n), ts))
+    columns = {
+        "ts": ts,
+        "symbol_id": np.zeros(n, np.int32),
+        "price": rng.uniform(100, 200, n),
+        "size": rng.uniform(0.001, 2, n),
+        "trade_id": rng.permutation(n).astype(np.int64),
+        "is_buyer_maker": rng.random(n) < 0.5
+    }
+    columns = {k: v[arrival] for k, v in columns.items()}
+
+    builder = StreamingBarBuilder()
+    for idx in np.array_split(np.arange(n), 7):
+        builder.update({k: v[idx] for k, v in columns.items()}, ["a"], now_ms=0)
+    builder.finalize_open()
+    streamed = builder.drain()
+
+    store.insert_tick_columns(columns, ["a"])
+    Resampler(store).resample_batch(["a"], ["1s"])
+    resampled = store.cursor().execute(
+        "SELECT ts, open, close, trade_count FROM ohlc WHERE timeframe = '1s' ORDER BY ts"
+    ).df()
+
+    assert builder.late_ticks == 0
+    pd.testing.assert_frame_equal(
+        streamed[["ts", "open", "close", "trade_count"]].reset_index(drop=True),
+        resampled,
+        check_dtype=False
+    )
@@ -0,0 +1,118 @@
+# tests/test_concurrent_writes.py
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from resampling.sampler import Resampler
+
+START_MS = 1_704_067_200_000
+
+
+def test_ingest_and_resampler_writes_do_not_conflict(store):
+    """
+    The ingest flush upserts 1s bars and queues revisions while the
+    resampler rebuilds revised 1s bars and cascades; both sides write the
+    same ohlc keys and bar_revisions rows.
+    """
+    errors = []
+    stop = threading.Event()
+
+    def ingest():
+        i = 0
+        while not stop.is_set():
+            ms = START_MS + 1000 * np.arange(i, i + 20, dtype=np.int64)
+            ts = pd.to_datetime(ms, unit="ms")
+            try:
+                store.insert_tick_columns(
+                    {
+                        "ts": ms,
+                        "symbol_id": np.zeros(20, np.int32),
+                        "price": np.ones(20),
+                        "size": np.ones(20),
+                        "trade_id": np.arange(i, i + 20, dtype=np.int64),
+                        "is_buyer_maker": np.zeros(20, bool)
+                    },
+                    ["a"]
+                )
+                store.upsert_ohlc(pd.DataFrame({
+                    "ts": ts, "symbol": "a", "timeframe": "1s",
+                    "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0,
+                    "volume": 1.0, "is_final": True
+                }))
+                store.insert_revisions("1s", [("a", t) for t in ts[:10]])
+            except Exception as e:
+                errors.append(e)
+            i += 5
+
+    def resample():
+        resampler = Resampler(store, build_base=False)
+        while not stop.is_set():
+            try:
+                resampler.resample_batch(["a"], ["1m", "5m"])
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=f) for f in (ingest, resample)]
+    for t in threads:
+        t.start()
+    stop.wait(3)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+
+
+def test_resampling_does_not_stall_ingest(store):
+    """
+    A first resample_batch over a large backlog aggregates for seconds; tick
+    inserts from the flush thread must not wait for it.
+    """
+    n = 2_000_000
+    rng = np.random.default_rng(0)
+    store.insert_tick_columns(
+        {
+            "ts": START_MS + np.arange(n, dtype=np.int64) * 5,
+            "symbol_id": rng.integers(0, 2, n).astype(np.int32),
+            "price": rng.uniform(100, 200, n),
+            "size": rng.uniform(0.001, 2, n),
+            "trade_id": np.arange(n, dtype=np.int64),
+            "is_buyer_maker": rng.random(n) < 0.5
+        },
+        ["a", "b"]
+    )
+
+    latencies = []
+    done = threading.Event()
+
+    def ingest():
+        i = n
+        while not done.is_set():
+            t0 = time.perf_counter()
+            store.insert_tick_columns(
+                {
+                    "ts": START_MS + 5 * np.arange(i, i + 100, dtype=np.int64),
+                    "symbol_id": np.zeros(100, np.int32),
+                    "price": np.ones(100),
+                    "size": np.ones(100),
+                    "trade_id": np.arange(i, i + 100, dtype=np.int64),
+                    "is_buyer_maker": np.zeros(100, bool)
+                },
+                ["a", "b"]
+            )
+            latencies.append(time.perf_counter() - t0)
+            i += 100
+            time.sleep(0.01)
+
+    thread = threading.Thread(target=ingest)
+    thread.start()
+    t0 = time.perf_counter()
+    Resampler(store).resample_batch(["a", "b"], ["1d", "tick_1000"])
+    elapsed = time.perf_counter() - t0
+    done.set()
+    thread.join()
+
+    assert max(latencies) < 0.25 * elapsed, (max(latencies), elapsed)
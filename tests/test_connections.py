@@ -0,0 +1,20 @@
+# tests/test_connections.py
+
+import threading
+
+
+def test_cursors_of_exited_threads_are_closed(store):
+    connections = store.connections
+    store.cursor()
+    baseline = connections.open_cursors()
+
+    # One short-lived thread per "rerun", as Streamlit does
+    for _ in range(50):
+        t = threading.Thread(target=lambda: store.cursor().execute("SELECT 1").fetchall())
+        t.start()
+        t.join()
+
+    assert connections.open_cursors() <= baseline + 1
+
+    # The calling thread keeps its cursor across the reaping
+    assert store.cursor().execute("SELECT 42").fetchone() == (42,)
@@ -0,0 +1,66 @@
+# tests/test_fetch.py
+
+import numpy as np
+import pandas as pd
+
+from analytics.correlation import rolling_correlation
+from analytics.hedge import compute_zscore
+
+START = pd.Timestamp("2024-01-01")
+
+
+def fill(store):
+    rng = np.random.default_rng(0)
+    ts = pd.date_range(START, periods=500, freq="1min")
+    for symbol in ("a", "b"):
+        close = 100 + np.cumsum(rng.normal(size=len(ts)))
+        store.upsert_ohlc(pd.DataFrame({
+            "ts": ts, "symbol": symbol, "timeframe": "1m",
+            "open": close, "high": close, "low": close, "close": close,
+            "volume": 1.0, "is_final": True
+        }))
+
+
+def test_fetch_numpy_range_feeds_array_analytics(store):
+    fill(store)
+    start, end = START + pd.Timedelta(minutes=100), START + pd.Timedelta(minutes=400)
+
+    a = store.fetch_numpy("ohlc", ["ts", "close"], "a", "1m", start, end)
+    b = store.fetch_numpy("ohlc", ["ts", "close"], "b", "1m", start, end)
+
+    assert set(a) == {"ts", "close"}
+    assert len(a["close"]) == 300
+    assert pd.Timestamp(a["ts"][0]) == start and pd.Timestamp(a["ts"][-1]) < end
+
+    expected = store.cursor().execute(
+        """
+        SELECT symbol, close FROM ohlc
+        WHERE timeframe = '1m' AND ts >= ? AND ts < ?
+        ORDER BY ts
+        """,
+        [start, end]
+    ).df()
+    sa = expected.loc[expected.symbol == "a", "close"].reset_index(drop=True)
+    sb = expected.loc[expected.symbol == "b", "close"].reset_index(drop=True)
+
+    np.testing.assert_allclose(compute_zscore(a["close"], 30), compute_zscore(sa, 30), equal_nan=True)
+    np.testing.assert_allclose(
+        rolling_correlation(a["close"], b["close"], 30),
+        rolling_correlation(sa, sb, 30),
+        equal_nan=True
+    )
+
+
+def test_arrow_fetch_and_batches_match(store):
+    fill(store)
+
+    table = store.fetch_arrow("ohlc", ["ts", "symbol", "close"], timeframe="1m")
+    batches = list(store.iter_batches("ohlc", ["ts", "symbol", "close"], timeframe="1m", batch_rows=128))
+
+    assert table.num_rows == 1000
+    assert sum(batch.num_rows for batch in batches) == 1000
+    assert max(batch.num_rows for batch in batches) <= 128
+    np.testing.assert_array_equal(
+        np.concatenate([batch.column("close").to_numpy() for batch in batches]),
+        table.column("close").to_numpy()
+    )
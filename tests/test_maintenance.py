@@ -0,0 +1,114 @@
+# tests/test_maintenance.py
+
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from resampling.sampler import Resampler
+from storage.maintenance import MaintenanceJob
+
+NOW = datetime(2024, 3, 1)
+
+
+def old_bars(n):
+    return pd.DataFrame({
+        "ts": pd.date_range("2024-01-01", periods=n, freq="1s"),
+        "symbol": "a", "timeframe": "1s",
+        "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0,
+        "volume": 1.0, "is_final": True
+    })
+
+
+def test_checkpoint_while_ingest_and_resampler_write(store):
+    job = MaintenanceJob(store, rules={("ohlc", "1s"): 30}, hot_tick_hours=None)
+    stop = threading.Event()
+
+    def ingest():
+        i = 0
+        while not stop.is_set():
+            ms = 1_709_251_200_000 + 1000 * np.arange(i, i + 50_000, dtype=np.int64)
+            store.insert_tick_columns(
+                {
+                    "ts": ms,
+                    "symbol_id": np.zeros(len(ms), np.int32),
+                    "price": np.ones(len(ms)),
+                    "size": np.ones(len(ms)),
+                    "trade_id": np.arange(len(ms), dtype=np.int64),
+                    "is_buyer_maker": np.zeros(len(ms), bool)
+                },
+                ["a"]
+            )
+            store.upsert_ohlc(old_bars(2000))
+            i += len(ms)
+
+    def resample():
+        resampler = Resampler(store)
+        while not stop.is_set():
+            resampler.resample_batch(["a"], ["1m", "5m"])
+
+    writers = [threading.Thread(target=f) for f in (ingest, resample)]
+    for t in writers:
+        t.start()
+    try:
+        for _ in range(20):
+            job.run_once(now=NOW)
+    finally:
+        stop.set()
+        for t in writers:
+            t.join()
+
+    assert job.get_metrics()["runs"] == 20
+
+
+def test_deletes_are_counted_when_checkpoint_fails(store, monkeypatch):
+    store.upsert_ohlc(old_bars(100))
+    job = MaintenanceJob(store, rules={("ohlc", "1s"): 30}, hot_tick_hours=None)
+
+    def fail():
+        raise RuntimeError("checkpoint failed")
+
+    monkeypatch.setattr(store, "checkpoint", fail)
+    with pytest.raises(RuntimeError):
+        job.run_once(now=NOW)
+
+    assert job.get_metrics()["deleted"] == {("ohlc", "1s"): 100}
+
+
+def test_failed_archive_leaves_no_cold_files(store, monkeypatch):
+    ms = int(pd.Timestamp("2024-01-01").timestamp() * 1000) + 1000 * np.arange(5000, dtype=np.int64)
+    store.insert_tick_columns(
+        {
+            "ts": ms,
+            "symbol_id": np.zeros(len(ms), np.int32),
+            "price": np.ones(len(ms)),
+            "size": np.ones(len(ms)),
+            "trade_id": np.arange(len(ms), dtype=np.int64),
+            "is_buyer_maker": np.zeros(len(ms), bool)
+        },
+        ["a"]
+    )
+
+    con = store.cursor()
+    cursor = store.cursor
+
+    class FailingDelete:
+        def __getattr__(self, name):
+            return getattr(con, name)
+
+        def execute(self, query, *args):
+            if query.startswith("DELETE FROM ticks_hot"):
+                raise RuntimeError("delete failed")
+            return con.execute(query, *args)
+
+    monkeypatch.setattr(store, "cursor", FailingDelete)
+    with pytest.raises(RuntimeError):
+        store.archive_ticks(now=NOW)
+    monkeypatch.setattr(store, "cursor", cursor)
+
+    assert list(store.cold_dir.rglob("*.parquet")) == []
+    assert store.archive_ticks(now=NOW) == 5000
+    assert con.execute("SELECT COUNT(*), COUNT(DISTINCT trade_id) FROM ticks").fetchone() == (5000, 5000)
+    assert not any((store.cold_dir / "_staging").iterdir())
@@ -0,0 +1,32 @@
+# tests/test_recorder.py
+
+import threading
+
+from ingestion.recorder import FrameRecorder, FrameReplayer
+
+
+def test_close_while_socket_threads_record(tmp_path):
+    recorder = FrameRecorder(tmp_path, segment_bytes=4096)
+    errors = []
+    started = threading.Barrier(5)
+
+    def record():
+        started.wait()
+        try:
+            for i in range(20_000):
+                recorder.record(b'{"e":"trade","t":%d}' % i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for t in threads:
+        t.start()
+    started.wait()
+    recorder.close()
+    segments = set(tmp_path.glob("*.seg.gz"))
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert set(tmp_path.glob("*.seg.gz")) == segments
+    assert sum(1 for _ in FrameReplayer(tmp_path).frames()) == recorder.frames
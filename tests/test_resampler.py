@@ -0,0 +1,144 @@
+# tests/test_resampler.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from resampling.sampler import Resampler
+from resampling.service import ResamplingService
+
+SYMBOLS = ["btcusdt", "ethusdt"]
+START_MS = 1_700_000_000_000
+
+
+def make_ticks(n=20_000, seed=1, span_ms=2 * 3_600_000):
+    """
+    Ticks in ts order. A short span gives many trades per millisecond;
+    trade_ids are shuffled so ties are not broken by arrival order.
+    """
+    rng = np.random.default_rng(seed)
+    return {
+        "ts": START_MS + np.sort(rng.integers(0, span_ms, n)).astype(np.int64),
+        "symbol_id": rng.integers(0, len(SYMBOLS), n).astype(np.int32),
+        "price": rng.uniform(100, 200, n),
+        "size": rng.uniform(0.001, 2, n),
+        "trade_id": rng.permutation(n).astype(np.int64),
+        "is_buyer_maker": rng.random(n) < 0.5
+    }
+
+
+def resample_in_batches(store, ticks, batches, timeframes):
+    resampler = Resampler(store)
+    for idx in np.array_split(np.arange(len(ticks["ts"])), batches):
+        store.insert_tick_columns({k: v[idx] for k, v in ticks.items()}, SYMBOLS)
+        resampler.resample_batch(SYMBOLS, timeframes)
+
+    # Volumes and VWAPs are float sums whose order may differ between passes
+    return store.cursor().execute("""
+        SELECT timeframe, symbol, ts, open, high, low, close, trade_count,
+            round(volume, 6), round(buy_volume, 6), round(sell_volume, 6),
+            round(vwap, 6), is_final
+        FROM ohlc
+        ORDER BY ALL
+    """).fetchall()
+
+
+@pytest.mark.parametrize("span_ms", [2 * 3_600_000, 5_000])
+@pytest.mark.parametrize("timeframes", [
+    ["1s", "1m", "5m", "1h"],
+    ["tick_100", "volume_50", "dollar_5000"]
+])
+def test_incremental_bars_match_full_recompute(make_store, timeframes, span_ms):
+    ticks = make_ticks(span_ms=span_ms)
+    full = resample_in_batches(make_store("full"), ticks, 1, timeframes)
+    incremental = resample_in_batches(make_store("incremental"), ticks, 37, timeframes)
+
+    assert {row[0] for row in full} >= set(timeframes)
+    assert incremental == full
+
+
+def test_late_ticks_revise_finalized_bars(make_store):
+    ticks = make_ticks()
+    # Every 50th tick arrives 40 ticks (around 15 s) after its neighbours,
+    # usually in a later batch than the bucket it belongs to
+    position = np.arange(len(ticks["ts"]))
+    arrival = np.argsort(position + 40 * (position % 50 == 49), kind="stable")
+    ticks = {k: v[arrival] for k, v in ticks.items()}
+
+    timeframes = ["1s", "1m", "5m"]
+    full = resample_in_batches(make_store("full"), ticks, 1, timeframes)
+    incremental = resample_in_batches(make_store("incremental"), ticks, 200, timeframes)
+
+    assert incremental == full
+
+
+def test_resample_builds_the_source_chain(store):
+    store.insert_tick_columns(make_ticks(1000), SYMBOLS)
+
+    written = Resampler(store).resample("btcusdt", "5m")
+
+    bars = store.cursor().execute(
+        "SELECT timeframe, count(*) FROM ohlc WHERE symbol = 'btcusdt' GROUP BY 1"
+    ).fetchall()
+    assert written > 0
+    assert {tf for tf, _ in bars} == {"1s", "1m", "5m"}
+
+
+def test_bootstrap_finalizes_legacy_bars(store):
+    """
+    Databases from before resample_state hold bars with is_final = false
+    and no watermarks; the first pass restarts from each pair's newest bar.
+    """
+    ticks = make_ticks()
+    half = len(ticks["ts"]) // 2
+    timeframes = ["1s", "1m", "5m", "tick_100"]
+
+    store.insert_tick_columns({k: v[:half] for k, v in ticks.items()}, SYMBOLS)
+    Resampler(store).resample_batch(SYMBOLS, timeframes)
+    con = store.cursor()
+    con.execute("DELETE FROM resample_state")
+    con.execute("UPDATE ohlc SET is_final = false")
+
+    store.insert_tick_columns({k: v[half:] for k, v in ticks.items()}, SYMBOLS)
+    Resampler(store).resample_batch(SYMBOLS, timeframes)
+
+    open_bars = con.execute(
+        "SELECT symbol, timeframe, count(*) FROM ohlc WHERE NOT is_final GROUP BY 1, 2"
+    ).fetchall()
+    assert len(open_bars) == len(SYMBOLS) * len(timeframes)
+    assert all(n == 1 for _, _, n in open_bars)
+
+
+def test_late_and_too_late_ticks_are_reported(store):
+    service = ResamplingService(store, SYMBOLS[:1], ["1m"], build_base=True)
+
+    def insert(ms):
+        ms = np.asarray(ms, dtype=np.int64)
+        store.insert_tick_columns(
+            {
+                "ts": ms,
+                "symbol_id": np.zeros(len(ms), np.int32),
+                "price": np.full(len(ms), 100.0),
+                "size": np.ones(len(ms)),
+                "trade_id": ms,
+                "is_buyer_maker": np.zeros(len(ms), bool)
+            },
+            SYMBOLS
+        )
+
+    insert(START_MS + 1000 * np.arange(1200))
+    service.run_once()
+    # 20 s and 15 min behind the newest tick; the lateness window is 60 s
+    insert([START_MS + 1_179_500, START_MS + 1_179_600])
+    insert([START_MS + 299_500, START_MS + 299_600, START_MS + 299_700])
+    service.run_once()
+    service.run_once()
+
+    metrics = service.get_metrics()
+    assert metrics["late_ticks"] == 2
+    assert metrics["too_late_ticks"] == 3
+    counts = dict(store.cursor().execute(
+        "SELECT ts, trade_count FROM ohlc WHERE timeframe = '1s' AND ts IN (?, ?)",
+        [pd.Timestamp(START_MS + 1_179_000, unit="ms"), pd.Timestamp(START_MS + 299_000, unit="ms")]
+    ).fetchall())
+    assert sorted(counts.values()) == [1, 3]
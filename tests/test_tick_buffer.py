@@ -0,0 +1,97 @@
+# tests/test_tick_buffer.py
+
+import json
+import sys
+import threading
+
+import numpy as np
+
+from ingestion.binance_ws import BinanceWebSocketIngestor
+from ingestion.flush_policy import FlushPolicy
+from ingestion.tick_buffer import ShardedTickBuffer
+
+
+def trade(ts, symbol, trade_id):
+    return json.dumps({
+        "e": "trade", "s": symbol, "T": ts,
+        "p": "100.0", "q": "1.0", "t": trade_id, "m": False
+    })
+
+
+def test_drop_oldest_is_global_across_shards():
+    buffer = ShardedTickBuffer(chunk_size=16)
+    for i in range(100):
+        buffer.append(1_000 + i, "A", 1.0, 1.0, i)
+    for i in range(50):
+        buffer.append(2_000 + i, "B", 1.0, 1.0, 100 + i)
+
+    assert buffer.drop_oldest(120) == 120
+    assert buffer.rows == 30
+
+    columns = buffer.drain()
+    # All of A went first, then the oldest 20 of B
+    assert sorted(columns["trade_id"]) == list(range(120, 150))
+
+
+def test_drop_oldest_breaks_ts_ties_without_overshooting():
+    buffer = ShardedTickBuffer()
+    for symbol in ("A", "B", "C"):
+        for i in range(10):
+            buffer.append(1_000, symbol, 1.0, 1.0, i)
+
+    assert buffer.drop_oldest(15) == 15
+    assert len(buffer.drain()["ts"]) == 15
+
+
+def test_overflow_keeps_the_arriving_symbol():
+    policy = FlushPolicy(max_rows=100, max_buffer_rows=100, overflow="drop_oldest")
+    ingestor = BinanceWebSocketIngestor(["a", "b"], datastore=None, flush_policy=policy)
+
+    for i in range(100):
+        ingestor._on_message(None, trade(1_000 + i, "A", i))
+    for i in range(50):
+        ingestor._on_message(None, trade(2_000 + i, "B", 100 + i))
+        assert ingestor._buffer.rows <= policy.max_buffer_rows
+
+    columns = ingestor._buffer.drain()
+    symbols = np.array(ingestor._buffer.symbols)[columns["symbol_id"]]
+    kept_a = columns["trade_id"][symbols == "a"]
+
+    assert np.count_nonzero(symbols == "b") == 50
+    assert ingestor.get_metrics()["dropped"] + len(columns["ts"]) == 150
+    # A lost its oldest ticks, not its newest
+    assert kept_a.min() > 0 and kept_a.max() == 99
+
+
+def test_rows_stays_exact_under_concurrent_drains():
+    buffer = ShardedTickBuffer(chunk_size=256)
+    drained = []
+
+    def produce(symbol):
+        for i in range(50_000):
+            buffer.append(i, symbol, 1.0, 1.0, i)
+
+    # Stops draining while producers are still appending, so nothing
+    # resynchronises the count afterwards
+    def consume():
+        while sum(drained) < 100_000:
+            columns = buffer.drain()
+            if columns is not None:
+                drained.append(len(columns["ts"]))
+
+    switch = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        producers = [threading.Thread(target=produce, args=(s,)) for s in "ABCD"]
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        for t in producers:
+            t.start()
+        consumer.join()
+        for t in producers:
+            t.join()
+    finally:
+        sys.setswitchinterval(switch)
+
+    assert buffer.rows == len(buffer)
+    assert sum(drained) + buffer.rows == 200_000
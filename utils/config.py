@@ -1,11 +1,67 @@
 # utils/config.py
 
+import os
+
 DEFAULT_SYMBOLS = ["btcusdt", "ethusdt"]
 
 DEFAULT_TIMEFRAME = "5m"
 DEFAULT_ROLLING_WINDOW = 50
 
+# Dashboard history window: label -> hours (None = all history)
+ANALYTICS_LOOKBACK_HOURS = {"6h": 6, "24h": 24, "7d": 24 * 7, "30d": 24 * 30, "All": None}
+DEFAULT_LOOKBACK = "7d"
+
 DEFAULT_Z_ALERT_THRESHOLD = 2.0
 DEFAULT_BACKTEST_ENTRY_Z = 2.0
 
-SUPPORTED_TIMEFRAMES = ["1s", "1m", "5m"]
+SUPPORTED_TIMEFRAMES = ["1s", "1m", "5m", "15m", "1h", "4h", "1d"]
+
+# Tick / volume / dollar bars, keyed "<type>_<threshold>" (resampling/sampler.py)
+SUPPORTED_INFO_BARS = ["tick_1000", "volume_100", "dollar_5000000"]
+
+# Ingestion
+# Override to point ingestion at a local stand-in (see ingestion/local_server.py)
+BINANCE_WS_BASE_URL = os.environ.get("BINANCE_WS_BASE_URL", "wss://fstream.binance.com")
+DEFAULT_SYMBOLS_PER_CONNECTION = 100
+DEFAULT_TICK_CHUNK_SIZE = 65536
+JSON_BACKEND = None  # None = fastest installed of orjson / ujson / json
+
+# Flush policy: flush on whichever of rows / bytes / age is hit first
+FLUSH_MAX_ROWS = 50_000
+FLUSH_MAX_BYTES = 8 * 1024 * 1024
+FLUSH_MAX_AGE = 1.0  # seconds
+MAX_BUFFER_ROWS = 1_000_000
+BUFFER_OVERFLOW = "block"  # block | drop_oldest | spill
+SPILL_DIR = "data/spill"
+
+# Raw frame capture (ingestion/recorder.py)
+RECORDER_DIR = "data/frames"
+RECORDER_SEGMENT_BYTES = 256 * 1024 * 1024  # uncompressed bytes per segment
+
+# Streaming 1s bars (resampling/bar_builder.py)
+STREAMING_BAR_GRACE_MS = 2000  # wall-clock wait past a bar's end before closing it
+ALLOWED_LATENESS_MS = 60_000   # late ticks older than this behind the newest are not revised
+
+# Background resampling (resampling/service.py)
+RESAMPLE_INTERVAL = 5.0      # seconds between runs when no flush arrives
+RESAMPLE_MIN_INTERVAL = 0.5  # minimum spacing between runs
+TOO_LATE_HORIZON_MS = 3_600_000  # with build_base, how far behind the lateness window too-late ticks are counted
+
+# Storage
+TICK_INSERT_METHOD = "numpy"  # numpy | arrow | append (see benchmarks/bench_bulk_insert.py)
+TICK_SCHEMA = "compact"       # standard | compact, for new databases (see benchmarks/bench_compact_schema.py)
+FETCH_BATCH_ROWS = 1_000_000    # rows per Arrow batch from MarketDataStore.iter_batches
+
+# Tick tiering: days older than this move from the hot table to Parquet
+HOT_TICK_MAX_AGE_HOURS = 24
+COLD_TICK_DIR = "data/cold/ticks"  # hive layout: symbol=<s>/date=<d>/*.parquet
+
+# Retention (storage/maintenance.py): days kept per (table, timeframe).
+# Tick retention covers both tiers; timeframes without a rule are kept forever.
+RETENTION_DAYS = {
+    ("ticks", None): 7,
+    ("ohlc", "1s"): 30,
+    ("ohlc", "1m"): 365,
+}
+RETENTION_BATCH_ROWS = 100_000    # rows per DELETE transaction
+MAINTENANCE_INTERVAL = 15 * 60    # seconds between maintenance runs